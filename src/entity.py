@@ -5,19 +5,23 @@ Date: 2024-06-10
 Description: Defines the Entity class representing individuals in the simulation.
 """
 
+import os
 import random
-import uuid
-from dataclasses import dataclass, field
 from enum import Enum
 
 from faker import Faker
 
-from params import entity_params
-
 fake = Faker(["it_IT", "en_US", "en_GB", "en_NZ"])
 WORLD_WIDTH = 1920
 WORLD_HEIGHT = 1080
 
+# Faker is slow per call, so draw a pool of names once and pick from it per birth
+NAME_POOL_SIZE = 4096
+_NAME_POOL = [
+    fake.first_name_nonbinary() if i % 2 else fake.last_name_nonbinary()
+    for i in range(NAME_POOL_SIZE)
+]
+
 
 class Status(Enum):
     THRIVING = "thriving"
@@ -28,11 +32,35 @@ class Status(Enum):
     DEAD = "dead"
 
 
-@dataclass
+# Status values are stored in the population as small integer codes
+STATUS_VALUES = tuple(s.value for s in Status)
+STATUS_CODES = {value: code for code, value in enumerate(STATUS_VALUES)}
+
+# Bound once so hot paths skip the Enum attribute lookup
+_DEAD, _ALIVE, _THRIVING, _STRUGGLING = (
+    s.value for s in (Status.DEAD, Status.ALIVE, Status.THRIVING, Status.STRUGGLING)
+)
+
+
+def _column(name: str, cast=float) -> property:
+    """Property that reads/writes this entity's row of a population column."""
+
+    def fget(self):
+        return cast(getattr(self.population, name)[self.index])
+
+    def fset(self, value):
+        getattr(self.population, name)[self.index] = value
+
+    return property(fget, fset)
+
+
 class Entity:
     """
     Represents an individual entity in the simulation.
 
+    Numeric stats live in a shared Population (one NumPy column per stat);
+    the entity itself only keeps its row index and non-numeric state.
+
     Attributes:
         id (str): Unique identifier for the entity.
         age (int): Current age of the entity (in simulation Epochs).
@@ -41,37 +69,86 @@ class Entity:
         status (str): Current status (e.g., 'alive', 'dead', 'thriving', 'struggling').
         parameters (dict): Customizable parameters for this specific entity type.
                            Examples: 'max_age', 'metabolism_rate', 'resilience'.
+                           May be the population's shared template, so treat
+                           it as read-only and copy before changing it.
     """
 
-    def __init__(self, initial_parameters: dict = None):  # type: ignore
+    __slots__ = (
+        "population",
+        "index",
+        "id",
+        "name",
+        "parameters",
+        "adaptation_bias",
+    )
+
+    health = _column("health")
+    energy = _column("energy")
+    age = _column("age", int)
+    resilience = _column("resilience")
+    foraging_efficiency = _column("foraging_efficiency")
+    metabolism_rate = _column("metabolism_rate")
+    reproduction_chance = _column("reproduction_chance")
+    mutation_rate = _column("mutation_rate")
+    aggression = _column("aggression")
+    cooperation = _column("cooperation")
+    health_recovery_rate = _column("health_recovery_rate")
+    health_decay_rate = _column("health_decay_rate")
+    # Read-only mirrors of the inherited parameters (see PARAMETER_COLUMNS)
+    base_aggression = _column("base_aggression")
+    base_metabolism_rate = _column("base_metabolism_rate")
+    base_resilience = _column("base_resilience")
+    base_foraging_efficiency = _column("base_foraging_efficiency")
+    base_reproduction_chance = _column("base_reproduction_chance")
+    min_reproduction_age = _column("min_reproduction_age", int)
+    x = _column("x", int)
+    y = _column("y", int)
+
+    def __init__(self, population, initial_parameters: dict = None):  # type: ignore
         """
         Initializes a new entity with default or provided parameters.
 
         Args:
+            population: The Population that stores this entity's stats.
             initial_parameters A dictionary of custom parameters for this entity. Defaults2 to None.
         """
-        self.id = str(uuid.uuid4())[:8]
+        self.population = population
+        self.index = population.allocate(self)
+        self.reset(initial_parameters)
+
+    def reset(self, initial_parameters: dict = None) -> None:  # type: ignore
+        """
+        (Re)initializes this entity in place, so a pooled handle and its
+        population row can be reused for a newborn without reallocating.
+
+        Args:
+            initial_parameters A dictionary of custom parameters for this entity. Defaults to None.
+        """
+        self.id = os.urandom(4).hex()
         self.age = 0
         # self.status = "alive"
-        self.parameters = entity_params.copy()
-        self.status = Status.ALIVE.value
+        self.status = _ALIVE
 
         # Spatial fields
-        self.x: int = random.randint(0, WORLD_WIDTH)
-        self.y: int = random.randint(0, WORLD_HEIGHT)
+        self.x = random.randint(0, WORLD_WIDTH)
+        self.y = random.randint(0, WORLD_HEIGHT)
 
-        self.environment_memory = []  # rolling record of past conditions
-        self.memory_span = 20  # how far back they “remember”
+        self.population.forget(self.index)  # rolling record of past conditions
         self.adaptation_bias = 1.0  # baseline multiplier for adaptation
 
-        if random.uniform(1, 3) % 2 == 0:
-            self.name = fake.first_name_nonbinary()
+        self.name = _NAME_POOL[random.randrange(NAME_POOL_SIZE)]
+
+        # Parameter dicts are never modified in place, so they can be shared:
+        # entities on the defaults share the population's template, offspring
+        # share their parent's complete dict, and only partial overrides
+        # (custom or mutant parameters) get merged into a dict of their own
+        defaults = self.population.entity_params
+        if not initial_parameters:
+            self.parameters = defaults
+        elif initial_parameters.keys() >= defaults.keys():
+            self.parameters = initial_parameters
         else:
-            self.name = fake.last_name_nonbinary()
-
-        # Override default parameters with any provided initial_parameters
-        if initial_parameters:
-            self.parameters.update(initial_parameters)
+            self.parameters = {**defaults, **initial_parameters}
 
         # "max_age": 99,
         # "thriving_threshold_health": 65.0,
@@ -80,6 +157,7 @@ class Entity:
         # "struggling_threshold_energy": 22.0,
         # "min_reproduction_age": 13,
 
+        self.population.load_parameters(self.index, self.parameters)
         self.health = self.parameters["initial_health"]
         self.energy = self.parameters["initial_energy"]
         self.resilience = self.parameters.get("resilience", 0.1)
@@ -92,30 +170,39 @@ class Entity:
         self.health_recovery_rate = self.parameters.get("health_recovery_rate", 1.0)
         self.health_decay_rate = self.parameters.get("health_decay_rate", 1.0)
 
+    @property
+    def environment_memory(self) -> list[float]:
+        """Remembered conditions, oldest first (see Population.remember)."""
+        return self.population.recall(self.index)
+
+    @property
+    def status(self) -> str:
+        return STATUS_VALUES[self.population.status[self.index]]
+
+    @status.setter
+    def status(self, value: str) -> None:
+        self.population.status[self.index] = STATUS_CODES[value]
+        self.population.alive[self.index] = value != _DEAD
+        self.population.invalidate()
+
+    @property
+    def status_code(self) -> int:
+        """Raw integer status code, for comparisons on hot paths."""
+        return int(self.population.status[self.index])
+
     def is_alive(self) -> bool:
         # return self.status != "dead"
-        return self.status != Status.DEAD.value
+        return bool(self.population.alive[self.index])
 
     def update_status(self) -> None:
         """
         Updates the entity's status based on its current health and energy.
         """
-        if self.health <= 0 or self.age >= self.parameters["max_age"]:
-            self.status = Status.DEAD.value
-            self.health = 0.0
-            self.energy = 0.0
-        elif (
-            self.health >= self.parameters["thriving_threshold_health"]
-            and self.energy >= self.parameters["thriving_threshold_energy"]
-        ):
-            self.status = Status.THRIVING.value
-        elif (
-            self.health <= self.parameters["struggling_threshold_health"]
-            or self.energy <= self.parameters["struggling_threshold_energy"]
-        ):
-            self.status = Status.STRUGGLING.value
-        else:
-            self.status = Status.ALIVE.value
+        self.population.update_status(slice(self.index, self.index + 1))
+
+    def mark_dead(self) -> None:
+        """Kill the entity outright, skipping the status checks."""
+        self.population.kill(self.index)
 
     def __repr__(self) -> str:
         return (
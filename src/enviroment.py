@@ -5,25 +5,75 @@ Date: 2024-06-10
 Description: Environment functions for the simulation.
 """
 
+from dataclasses import dataclass, fields
+
+import numpy as np
+
+from kernels import drift_kernel, feedback_kernel
 from utils.logging_config import setup_logger
 
 logger = setup_logger(__name__)
 
 
+@dataclass(slots=True)
+class EnvFactors:
+    """
+    Live environment state for a simulation run.
+
+    Built from a world preset dict; every factor is a plain slot attribute
+    so the per-epoch code reads `sim.env.pollution` instead of hashing a key.
+    Defaults match the "default" world preset.
+    """
+
+    resource_availability: float = 1.0
+    temperature: float = 25.0
+    pollution: float = 0.1
+    event_chance: float = 0.03
+    interaction_strength: float = 0.5
+    repoduction_rate: float = 0.1
+    mutation_rate: float = 0.1
+    mutation_strength: float = 0.01
+    predator_chance: float = 0.1
+    predator_threshold: float = 350
+    predator_impact_percentage: float = 0.13
+    resource_regeneration_rate: float = 0.5
+    seasonal_variation: float = 0.2
+    catastrophe_threshold: float = 0.0
+    radiation_background: float = 0.1
+    disaster_chance: float = 0.1
+    disaster_impact: float = 0.1
+    growth_rate: float = 1.0
+    death_rate: float = 1.15
+    competition_intensity: float = 0.5
+    carrying_capacity: float = 2500
+    prosperity_threshold: float = 200
+    prosperity_boost: float = 1.0
+    optimal_density: float = 1000
+    density_efficiency: float = 0.2
+    adaptive_environment: bool = False
+    interaction_radius: float = 0.0  # > 0 limits interactions to neighbours
+
+    @classmethod
+    def from_world(cls, world: dict) -> "EnvFactors":
+        """Pick the environment factors out of a world preset, ignoring metadata."""
+        names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in world.items() if k in names})
+
+
 def adapt_environment(sim):
     """
     Adaptive environment with ecological memory.
     World reacts to population pressure AND trends over time.
     """
-    if not sim.environment_factors.get("adaptive_environment"):
+    if not sim.env.adaptive_environment:
         return
 
-    alive_count = len([e for e in sim.entities if e.is_alive()])
-    capacity = sim.environment_factors.get("carrying_capacity", 1000)
+    alive_count = sim.population.alive_count()
+    capacity = sim.env.carrying_capacity
     density_ratio = alive_count / capacity
 
     if sim.population_history:
-        avg_past = sum(sim.population_history) / len(sim.population_history)
+        avg_past = sim.pop_history_sum / len(sim.population_history)
     else:
         avg_past = alive_count
 
@@ -31,148 +81,104 @@ def adapt_environment(sim):
 
     # --- Push back on persistent overgrowth ---
     if density_ratio > 1.2 or trend > 0.15:
-        sim.environment_factors["resource_availability"] *= 0.9
-        sim.environment_factors["disaster_chance"] *= 1.2
-        sim.environment_factors["radiation_background"] *= 1.05
-        sim.environment_factors["mutation_rate"] *= 1.1
+        sim.env.resource_availability *= 0.9
+        sim.env.disaster_chance *= 1.2
+        sim.env.radiation_background *= 1.05
+        sim.env.mutation_rate *= 1.1
 
         logger.info(
-            f"🌍 JTk remembers past abundance. Pop rising ({trend:+.2%}), "
-            "resources restricted and disasters intensify."
+            "🌍 JTk remembers past abundance. Pop rising (%+.2f%%), "
+            "resources restricted and disasters intensify.",
+            trend * 100,
         )
 
     # --- Assist recovery if population trending downward ---
     elif density_ratio < 0.4 or trend < -0.15:
-        sim.environment_factors["resource_availability"] *= 1.12
-        sim.environment_factors["disaster_chance"] *= 0.85
-        sim.environment_factors["mutation_rate"] *= 1.15
+        sim.env.resource_availability *= 1.12
+        sim.env.disaster_chance *= 0.85
+        sim.env.mutation_rate *= 1.15
 
         logger.info(
-            f"🌱 JTk recalls past collapse. Pop falling ({trend:+.2%}), "
-            "resources increased to stabilize life."
+            "🌱 JTk recalls past collapse. Pop falling (%+.2f%%), "
+            "resources increased to stabilize life.",
+            trend * 100,
         )
 
     # --- Optional: dampen overshooting ---
     if abs(trend) > 0.25:
-        sim.environment_factors["mutation_rate"] *= 1.2
+        sim.env.mutation_rate *= 1.2
         logger.info("⚠️ Rapid change triggers evolutionary pressure!")
 
     # Clamp factors to avoid runaway values
-    sim.environment_factors["resource_availability"] = max(
-        0.1, min(sim.environment_factors["resource_availability"], 2.0)
-    )
-    sim.environment_factors["mutation_rate"] = max(
-        0.01, min(sim.environment_factors["mutation_rate"], 0.8)
-    )
+    sim.env.resource_availability = max(0.1, min(sim.env.resource_availability, 2.0))
+    sim.env.mutation_rate = max(0.01, min(sim.env.mutation_rate, 0.8))
 
 
 def update_environment(sim):
     """
     Updates environmental factors over time or based on random events.
+    The clamped arithmetic runs in the compiled drift_kernel.
     """
-    sim.environment_factors["resource_availability"] = max(
-        0.1, 1.0 - (sim.current_time / sim.epochs) * 0.5
-    )  # Gradual changes over time
-
-    sim.environment_factors["temperature"] = 25.0 + 10 * (
-        sim.current_time / sim.epochs - 0.5
-    )  # Oscillates
-
-    sim.environment_factors["pollution"] = min(
-        0.8, (sim.current_time / sim.epochs) * 0.3
-    )  # Gradual increase in polution over time
-
-    sim.environment_factors["event_chance"] = min(
-        0.1, sim.environment_factors["event_chance"] + 0.001
-    )  # Slight increase in event chance over time
-
-    sim.environment_factors["interaction_strength"] = min(
-        1.0, sim.environment_factors["interaction_strength"] + 0.001
-    )  # Should this decrease over time? Maybe not.
-
-    sim.environment_factors["mutation_rate"] = min(
-        0.3, sim.environment_factors["mutation_rate"] + 0.0005
-    )  # Slight increase in mutation rate over time
+    env = sim.env
+    (
+        env.resource_availability,
+        env.temperature,
+        env.pollution,
+        env.event_chance,  # Slight increase in event chance over time
+        env.interaction_strength,  # Should this decrease over time? Maybe not.
+        env.mutation_rate,  # Slight increase in mutation rate over time
+    ) = drift_kernel(
+        sim.current_time / sim.epochs,
+        float(env.event_chance),
+        float(env.interaction_strength),
+        float(env.mutation_rate),
+    )
 
 
 def apply_feedback_loops(sim, population: int) -> None:
     """
     Mutate the world state in-place based on current population and environmental feedback loops.
     This creates emergent behavior where the simulation environment evolves dynamically over time.
+    The arithmetic itself runs in the compiled feedback_kernel.
     """
-
-    # --- Resource feedback ---
-    # As population grows, resources become scarcer unless regeneration is very high.
-    pressure = population / (sim.environment_factors["carrying_capacity"] + 1)
-    sim.environment_factors["resource_availability"] *= 1 - 0.1 * pressure
-    sim.environment_factors["resource_availability"] = max(
-        sim.environment_factors["resource_availability"], 0.05
-    )
-
-    # --- Pollution feedback ---
-    # More population = more waste and pollution. But if population crashes, environment heals.
-    pollution_change = 0.05 * pressure - 0.02 * (1 - pressure)
-    sim.environment_factors["pollution"] = max(
-        0.0, min(sim.environment_factors["pollution"] + pollution_change, 1.0)
+    env = sim.env
+    (
+        env.carrying_capacity,
+        env.resource_availability,
+        env.pollution,
+        env.mutation_rate,
+        env.disaster_chance,
+        env.disaster_impact,
+    ) = feedback_kernel(
+        float(population),
+        float(env.carrying_capacity),
+        float(env.resource_availability),
+        float(env.pollution),
+        float(env.mutation_rate),
+        float(env.radiation_background),
+        float(env.disaster_chance),
+        float(env.disaster_impact),
     )
 
-    # --- Mutation pressure feedback ---
-    # Higher radiation or pollution boosts mutation rate slightly over time.
-    sim.environment_factors["mutation_rate"] *= (
-        1 + 0.1 * sim.environment_factors["radiation_background"]
-    )
-    sim.environment_factors["mutation_rate"] = min(
-        sim.environment_factors["mutation_rate"], 1.0
-    )
 
-    # --- Carrying capacity evolution ---
-    # If the population consistently approaches carrying capacity, the environment may adapt
-    # (e.g., niche expansion or ecosystem collapse if overshoot persists).
-    if pressure > 0.8:
-        # Stressful overshoot: risk ecosystem degradation
-        sim.environment_factors["carrying_capacity"] *= 0.995
-    elif 0.3 < pressure < 0.6:
-        # Sustainable level: slight growth over time
-        sim.environment_factors["carrying_capacity"] *= 1.002
-
-    # Keep carrying capacity reasonable
-    sim.environment_factors["carrying_capacity"] = max(
-        50, min(sim.environment_factors["carrying_capacity"], 10000)
-    )
+def handle_enviroment_memory(sim):
+    """
+    Nudges every living entity's traits toward what its remembered
+    conditions favour, then applies the world drift, as whole-column ops.
+    """
+    pop = sim.population
+    rows = pop.alive_idx
+    rows = rows[pop.memory_len[rows] > 0]
+    avg_condition = pop.memory_average(rows)
 
-    # --- Disaster & event feedback ---
-    # Pollution and radiation slightly increase disaster frequency and impact.
-    sim.environment_factors["disaster_chance"] += (
-        0.01 * sim.environment_factors["pollution"]
-    )
-    sim.environment_factors["disaster_impact"] += (
-        0.01 * sim.environment_factors["radiation_background"]
-    )
+    tough = avg_condition < -0.1  # life’s tough, evolve survival mode
+    good = avg_condition > 0.1  # Life's been good for me so far...
 
-    # Keep them capped
-    sim.environment_factors["disaster_chance"] = min(
-        sim.environment_factors["disaster_chance"], 1.0
+    pop.resilience[rows] *= np.where(tough, 1.05, np.where(good, 0.95, 1.0)) * sim.drift
+    pop.metabolism_rate[rows] *= (
+        np.where(tough, 0.95, np.where(good, 1.05, 1.0)) * sim.drift
     )
-    sim.environment_factors["disaster_impact"] = min(
-        sim.environment_factors["disaster_impact"], 1.0
-    )
-
-
-def handle_enviroment_memory(entity, drift: float):
-    avg_condition = sum(entity.environment_memory) / len(entity.environment_memory)
-
-    if avg_condition < -0.1:  # life’s tough, evolve survival mode
-        entity.resilience *= 1.05
-        entity.metabolism_rate *= 0.95
-        entity.reproduction_chance *= 0.9
-
-    elif avg_condition > 0.1:  # Life's been good for me so far...
-        entity.resilience *= 0.95
-        entity.metabolism_rate *= 1.05
-        entity.reproduction_chance *= 1.1
-
-    entity.resilience *= drift
-    entity.metabolism_rate *= drift
+    pop.reproduction_chance[rows] *= np.where(tough, 0.9, np.where(good, 1.1, 1.0))
 
 
 # filepath: /home/jtk/Dev/TerminalLifeform/src/enviroment.py
@@ -6,177 +6,203 @@ Description: Random and dynamic event functions for the simulation.
 """
 
 import random
+from collections.abc import Callable
+from itertools import accumulate
 
-from colored import Back, Style
+import numpy as np
 
 from stats import event_tracker
+from utils.ansi import Back, Style
 from utils.logging_config import setup_logger
 
 logger = setup_logger(__name__)
 
+# Dedicated generator for the scalar draws here; batched per-row draws go
+# through the Population's NumPy generator instead.
+_rng = random.Random()
 
-def trigger_random_events(sim):  # noqa: C901
+
+def seed_events(seed: int | None) -> None:
     """
-    Handle a random environmental event during the simulation.
-    `sim` is the Simulation instance, so you can access:
-       sim.environment_factors, sim.entities, sim.current_time, etc.
+    Reseed the event generator: with `seed` for a reproducible run, or from
+    fresh OS entropy when it is None.
     """
+    _rng.seed(seed)
+
+
+# (name, damage) for each predator event. Heavier hitters are drawn more
+# often: the damage doubles as the sampling weight.
+PREDATOR_TYPES = (
+    ("Nuclear War", 0.8),
+    ("Dimensional Rift", 0.75),
+    ("Asteroid Impact", 0.7),
+    ("Environmental Collapse", 0.65),
+    ("Supervolcano", 0.6),
+    ("Genetic Experiment Gone Wrong", 0.6),
+    ("Ancient Beast", 0.55),
+    ("Supernatural Entities", 0.5),
+    ("Cybernetic Organisms", 0.5),
+    ("Mutant Swarm", 0.45),
+    ("Alien Invasion", 0.4),
+    ("Sentient AI", 0.4),
+    ("Robot Uprising", 0.35),
+    ("Godzilla", 0.33),
+    ("Apex Predator", 0.31),
+    ("Space Pirates", 0.3),
+    ("Time Travelers", 0.25),
+    ("Human Sacrifice", 0.225),
+    ("Zombie Outbreak", 0.2),
+    ("Plague", 0.15),
+    ("Mutant Wolf Pack", 0.1),
+)
+_PREDATOR_CUM_WEIGHTS = list(accumulate(damage for _, damage in PREDATOR_TYPES))
+
+# Wild card messages, colored once at import rather than on every event
+_MSG_RESOURCE_SPIKE = Back.green + "Environmental Event - Resource Spike!" + Style.reset
+_MSG_RESOURCE_CRASH = Back.red + "Environmental Event - Resource Crash!" + Style.reset
+_MSG_DISEASE_OUTBREAK = (
+    Back.magenta + "Environmental Event - Disease Outbreak!" + Style.reset
+)
+_MSG_HEATWAVE = Back.yellow + "Environmental Event - Heatwave!" + Style.reset
+_MSG_RADIATION_BURST = (
+    Back.cyan + "Environmental Event - Radiation Burst!" + Style.reset
+)
+_MSG_COLD_SNAP = Back.blue + "Environmental Event - Cold Snap!" + Style.reset
+_MSG_MUTAGENIC_WAVE = (
+    Back.magenta
+    + "Environmental Event - Mutagenic Wave! Some entities evolved rapidly."
+    + Style.reset
+)
+_MSG_METEOR_STRIKE = (
+    "Time %d: "
+    + Back.red
+    + "Environmental Event - Meteor Strike! %d entities obliterated!"
+    + Style.reset
+)
+
+
+def _damage_random_rows(pop, k: int, low: float, high: float) -> np.ndarray:
+    """
+    Deal uniform(low, high) damage to up to k random living rows in one
+    batched draw, clamping health at zero. Returns the rows hit.
+    """
+    rows = pop.sample_alive(k)
+    health = pop.health[rows]
+    health -= pop.rng.uniform(low, high, size=rows.size)
+    np.maximum(health, 0.0, out=health)
+    pop.health[rows] = health
+    return rows
 
-    if random.random() > sim.environment_factors["event_chance"]:
-        return  # No event this epoch
 
-    logger.info("\n 🃏 Wild Card!")
-    event_type = random.choice(
-        [
-            "resource_spike",
-            "resource_crash",
-            "disease_outbreak",
-            "heatwave",
-            "radiation_burst",
-            "cold_snap",
-            "meteor_strike",
-            "mutagenic_wave",
-        ]
-    )
-
-    if event_type == "resource_spike":
-        sim.environment_factors["resource_availability"] = min(
-            1.0, sim.environment_factors["resource_availability"] + 0.2
-        )
-        logger.info(
-            f"Time {sim.current_time}: {Back.green}Environmental Event - Resource Spike!{Style.reset}"
-        )
+def _resource_spike(sim):
+    sim.env.resource_availability = min(1.0, sim.env.resource_availability + 0.2)
+    logger.info("Time %d: %s", sim.current_time, _MSG_RESOURCE_SPIKE)
 
-    elif event_type == "resource_crash":
-        sim.environment_factors["resource_availability"] = max(
-            0.0, sim.environment_factors["resource_availability"] - 0.3
-        )
-        sim.environment_factors["temperature"] = max(
-            0.0, sim.environment_factors["temperature"] - random.uniform(5, 15)
-        )
-        logger.info(
-            f"Time {sim.current_time}: {Back.red}Environmental Event - Resource Crash!{Style.reset}"
-        )
 
-    elif event_type == "disease_outbreak":
-        for entity in random.sample(sim.entities, min(len(sim.entities), 10)):
-            if entity.is_alive():
-                entity.health = max(0, entity.health - random.uniform(10, 30))
-        logger.info(
-            f"Time {sim.current_time}: {Back.magenta}Environmental Event - Disease Outbreak!{Style.reset}"
-        )
+def _resource_crash(sim):
+    sim.env.resource_availability = max(0.0, sim.env.resource_availability - 0.3)
+    sim.env.temperature = max(0.0, sim.env.temperature - _rng.uniform(5, 15))
+    logger.info("Time %d: %s", sim.current_time, _MSG_RESOURCE_CRASH)
 
-    elif event_type == "heatwave":
-        sim.environment_factors["temperature"] = min(
-            45.0, sim.environment_factors["temperature"] + random.uniform(5, 10)
-        )
-        logger.info(
-            f"Time {sim.current_time}: {Back.yellow}Environmental Event - Heatwave!{Style.reset}"
-        )
 
-    elif event_type == "radiation_burst":
-        for entity in random.sample(sim.entities, min(len(sim.entities), 5)):
-            if entity.is_alive():
-                entity.health = max(0, entity.health - random.uniform(20, 40))
-        logger.info(
-            f"Time {sim.current_time}: {Back.cyan}Environmental Event - Radiation Burst!{Style.reset}"
-        )
+def _disease_outbreak(sim):
+    _damage_random_rows(sim.population, 10, 10.0, 30.0)
+    logger.info("Time %d: %s", sim.current_time, _MSG_DISEASE_OUTBREAK)
 
-    elif event_type == "cold_snap":
-        sim.environment_factors["temperature"] = max(
-            -10.0, sim.environment_factors["temperature"] - random.uniform(5, 15)
-        )
-        logger.info(
-            f"Time {sim.current_time}: {Back.blue}Environmental Event - Cold Snap!{Style.reset}"
-        )
 
-    elif event_type == "meteor_strike":
-        # Randomly kill a few entities outright
-        victims = random.sample(sim.entities, min(len(sim.entities), 3))
-        for entity in victims:
-            entity.health = 0
-        logger.info(
-            f"Time {sim.current_time}: {Back.red}Environmental Event - Meteor Strike! {len(victims)} entities obliterated!{Style.reset}"
-        )
+def _heatwave(sim):
+    sim.env.temperature = min(45.0, sim.env.temperature + _rng.uniform(5, 10))
+    logger.info("Time %d: %s", sim.current_time, _MSG_HEATWAVE)
+
+
+def _radiation_burst(sim):
+    _damage_random_rows(sim.population, 5, 20.0, 40.0)
+    logger.info("Time %d: %s", sim.current_time, _MSG_RADIATION_BURST)
 
-    elif event_type == "mutagenic_wave":
-        # Mutate some entities randomly
-        for entity in random.sample(sim.entities, min(len(sim.entities), 5)):
-            if entity.is_alive():
-                entity.resilience *= random.uniform(1.1, 1.5)
-                entity.foraging_efficiency *= random.uniform(0.9, 1.3)
-        logger.info(
-            f"Time {sim.current_time}: {Back.magenta}Environmental Event - Mutagenic Wave! Some entities evolved rapidly.{Style.reset}"
-        )
+
+def _cold_snap(sim):
+    sim.env.temperature = max(-10.0, sim.env.temperature - _rng.uniform(5, 15))
+    logger.info("Time %d: %s", sim.current_time, _MSG_COLD_SNAP)
+
+
+def _meteor_strike(sim):
+    # Randomly kill a few entities outright
+    victims = sim.population.sample_alive(3)
+    sim.population.kill(victims)
+    logger.info(_MSG_METEOR_STRIKE, sim.current_time, victims.size)
+
+
+def _mutagenic_wave(sim):
+    # Mutate some entities randomly
+    pop = sim.population
+    rows = pop.sample_alive(5)
+    pop.resilience[rows] *= pop.rng.uniform(1.1, 1.5, size=rows.size)
+    pop.foraging_efficiency[rows] *= pop.rng.uniform(0.9, 1.3, size=rows.size)
+    logger.info("Time %d: %s", sim.current_time, _MSG_MUTAGENIC_WAVE)
+
+
+# Wild card event name -> handler, all equally likely
+_EVENT_HANDLERS: dict[str, Callable] = {
+    "resource_spike": _resource_spike,
+    "resource_crash": _resource_crash,
+    "disease_outbreak": _disease_outbreak,
+    "heatwave": _heatwave,
+    "radiation_burst": _radiation_burst,
+    "cold_snap": _cold_snap,
+    "meteor_strike": _meteor_strike,
+    "mutagenic_wave": _mutagenic_wave,
+}
+_EVENT_KEYS = tuple(_EVENT_HANDLERS)
+
+
+def trigger_random_events(sim):
+    """
+    Handle a random environmental event during the simulation.
+    `sim` is the Simulation instance, so you can access:
+       sim.env, sim.entities, sim.current_time, etc.
+    """
+
+    if _rng.random() > sim.env.event_chance:
+        return  # No event this epoch
+
+    logger.info("\n 🃏 Wild Card!")
+    _EVENT_HANDLERS[_rng.choice(_EVENT_KEYS)](sim)
 
 
 def trigger_predator_event(sim, severity: float):
     # Dynamic Event: Predator if population is too high
     logger.info("\n💥 Disaster!")
-    alive_count = len([e for e in sim.entities if e.is_alive()])
-
-    predator_types = [
-        ("Nucluear War", 0.8),
-        ("Dimensional Rift", 0.75),
-        ("Asteroid Impact", 0.7),
-        ("Environmental Collapse", 0.65),
-        ("Supervolcano", 0.6),
-        ("Genetic Experiment Gone Wrong", 0.6),
-        ("Ancient Beast", 0.55),
-        ("Supernatural Entities", 0.5),
-        ("Cybernetic Organisms", 0.5),
-        ("Mutant Swarm", 0.45),
-        ("Alien Invasion", 0.4),
-        ("Sentient AI", 0.4),
-        ("Robot Uprising", 0.35),
-        ("Godzilla", 0.33),
-        ("Apex Predator", 0.31),
-        ("Space Pirates", 0.3),
-        ("Time Travelers", 0.25),
-        ("Human Sacrifice", 0.225),
-        ("Zombie Outbreak", 0.2),
-        ("Plague", 0.15),
-        ("Mutant Wolf Pack", 0.1),
-    ]
-    predator_type, damage = random.choice(predator_types)
+    alive_count = sim.population.alive_count()
+
+    predator_type, damage = _rng.choices(
+        PREDATOR_TYPES, cum_weights=_PREDATOR_CUM_WEIGHTS
+    )[0]
 
     if (
-        alive_count > sim.environment_factors["predator_threshold"]
-        and random.random() > sim.environment_factors["predator_chance"]
+        alive_count > sim.env.predator_threshold
+        and _rng.random() > sim.env.predator_chance
     ):
         num_to_remove = int(
-            alive_count
-            * sim.environment_factors["predator_impact_percentage"]
-            * damage
-            * severity
+            alive_count * sim.env.predator_impact_percentage * damage * severity
         )
 
         num_to_remove = max(1, num_to_remove)  # Ensure 1 entity is removed
 
         # Prioritize struggling entities if possible, otherwise random
-        struggling_entities = [
-            e for e in sim.entities if e.status == "struggling" and e.is_alive()
-        ]
-        if len(struggling_entities) >= num_to_remove:
-            targets = random.sample(struggling_entities, num_to_remove)
+        pop = sim.population
+        struggling = pop.struggling_idx
+        if struggling.size >= num_to_remove:
+            targets = pop.rng.choice(struggling, num_to_remove, replace=False)
         else:
-            targets = random.sample(
-                [e for e in sim.entities if e.is_alive()],
-                min(num_to_remove, alive_count),
-            )
-
-        removed_entities = []
+            targets = pop.sample_alive(num_to_remove)
 
-        for entity in targets:
-            entity.health = 0  # Predator instantly kills
-            entity.update_status()  # Mark as dead
-            removed_entities.append(entity.name)
+        pop.kill(targets)  # Predator instantly kills
 
         event_tracker(
             "disaster",
             event=f"Disaster Alert! - {predator_type} Attack!!!",
             time=sim.current_time,
-            name=len(removed_entities),
+            name=targets.size,
         )
 
 
@@ -184,31 +210,22 @@ def trigger_natural_disaster(sim, severity: float):
     # Dynamic Event: Natural Disaster if pollution or temp too high
     logger.info("\n 💨 Natural Disaster!")
     if (
-        sim.environment_factors["pollution"] > 0.5
-        or sim.environment_factors["temperature"] > 35.0
-    ) and random.random() < sim.environment_factors["disaster_chance"]:
+        sim.env.pollution > 0.5 or sim.env.temperature > 35.0
+    ) and _rng.random() < sim.env.disaster_chance:
         # Disaster occurs
-        alive_count = len([e for e in sim.entities if e.is_alive()])
-        num_to_remove = int(
-            alive_count * sim.environment_factors["disaster_impact"] * severity
-        )
+        pop = sim.population
+        alive_count = pop.alive_count()
+        num_to_remove = int(alive_count * sim.env.disaster_impact * severity)
         num_to_remove = max(1, num_to_remove)  # Ensure at least 1 entity is removed
 
-        removed_entities = []
-
-        for entity in random.sample(
-            [e for e in sim.entities if e.is_alive()],
-            min(num_to_remove, alive_count),
-        ):
-            entity.health = 0  # Disaster instantly kills
-            entity.update_status()  # Mark as dead
-            removed_entities.append(entity.name)
+        targets = pop.sample_alive(num_to_remove)
+        pop.kill(targets)  # Disaster instantly kills
 
         event_tracker(
             "disaster",
             event="Natural Disaster!",
             time=sim.current_time,
-            name=len(removed_entities),
+            name=targets.size,
         )
 
 
@@ -1,191 +1,230 @@
+import logging
 import math
-import random
 
-from colored import Back, Fore, Style
+import numpy as np
 
-from entity import Entity
-from stats import event_tracker
+from kernels import STRUGGLING, mutate_kernel
+from stats import event_tracker, track_events
+from utils.ansi import Back, Fore, Style
 from utils.logging_config import setup_logger
 from utils.utils import pause_simulation
 
 logger = setup_logger(__name__)
 
+# Per-epoch log messages with the colors baked in once
+_MSG_NO_INTERACTIONS = (
+    Style.BOLD + Fore.cyan + "No entities to interact with." + Style.reset
+)
+_MSG_OVER_CAPACITY = (
+    "📢 "
+    + Back.magenta
+    + "Population pushing sustainable limits captain!"
+    + Style.reset
+)
+
+# Parameters that can mutate: (name, min, max, is_int). Unpacked into
+# parallel arrays once at import for mutate_kernel.
+_MUTABLE_PARAMS = (
+    ("max_age", 50, 99, True),
+    ("metabolism_rate", 0.2, 0.9, False),
+    ("resilience", 0.2, 0.8, False),
+    ("reproduction_chance", 0.01, 0.15, False),
+    ("aggression", 0.0, 0.9, False),
+)
+_MUTABLE_NAMES = tuple(name for name, *_ in _MUTABLE_PARAMS)
+_MUTABLE_MIN = np.array([low for _, low, _, _ in _MUTABLE_PARAMS], dtype=np.float64)
+_MUTABLE_MAX = np.array([high for _, _, high, _ in _MUTABLE_PARAMS], dtype=np.float64)
+_MUTABLE_IS_INT = np.array([is_int for *_, is_int in _MUTABLE_PARAMS])
+
 
 def handle_interactions(sim):
     """
     Handles interactions between entities, e.g., resource competition.
     """
-    alive_entities = [e for e in sim.entities if e.is_alive()]
-    num_alive = len(alive_entities)
+    num_alive = sim.population.alive_count()
 
     if num_alive < 2:
         # No interactions if less than 2 entities
-        logger.debug(
-            f"{Style.BOLD}{Fore.cyan}No entities to interact with.{Style.reset}"
-        )
+        logger.debug(_MSG_NO_INTERACTIONS)
         return
 
     # Interaction intensity increases with population density and low resources
-    interaction_modifier = (1.0 - sim.environment_factors["resource_availability"]) + (
+    interaction_modifier = (1.0 - sim.env.resource_availability) + (
         num_alive / 100.0
     )  # Simple scaling
     interaction_modifier = min(
         1.0, max(0.1, interaction_modifier)
     )  # Clamp between 0.1 and 1.0
 
-    for _, entity1 in enumerate(alive_entities):
-        # Each entity interacts with a small random subset of others
-        # To avoid N*N complexity for large populations
-        num_interactions = min(num_alive - 1, 3)  # Interact with up to 3 other entities
-        potential_targets = [e for e in alive_entities if e.id != entity1.id]
-
-        if not potential_targets:
-            continue
-
-        for entity2 in random.sample(potential_targets, num_interactions):
-            # Simple competition: entities lose health/energy based on aggression and resource scarcity
-            if entity1.is_alive() and entity2.is_alive():
-                # Entity1 impacts Entity2
-                damage_to_entity2 = (
-                    entity1.parameters["aggression"]
-                    * sim.environment_factors["interaction_strength"]
-                    * interaction_modifier
-                )
-                entity2.health = max(0.0, entity2.health - damage_to_entity2 + 0.1)
-                entity2.energy = max(
-                    0.0, entity2.energy - damage_to_entity2 / 2
-                )  # Energy loss is half of health loss
-
-                # Entity2 impacts Entity1 (can be symmetrical or asymmetrical)
-                damage_to_entity1 = (
-                    entity2.parameters["aggression"]
-                    * sim.environment_factors["interaction_strength"]
-                    * interaction_modifier
-                )
-                entity1.health = max(0.0, entity1.health - damage_to_entity1)
-                entity1.energy = max(0.0, entity1.energy - damage_to_entity1 / 2 + 0.1)
-
-                logger.debug(
-                    f"Time {sim.current_time}: Interaction between {entity1.id} and {entity2.id}. "
-                    f"E1 Health:{entity1.health:.1f}, E2 Health:{entity2.health:.1f}"
-                )
-                # Note: Using debug level for frequent interaction logs to avoid overwhelming INFO level output
+    # Each entity interacts with a small random subset of others
+    # To avoid N*N complexity for large populations
+    pop = sim.population
+    radius = sim.env.interaction_radius
+    if radius > 0:  # Worlds with an interaction radius only meet neighbours
+        a, b = pop.pick_neighbours(3, radius)
+    else:
+        a, b = pop.pick_partners(3)  # Interact with up to 3 other entities
+    scale = sim.env.interaction_strength * interaction_modifier
+
+    # Simple competition: entities lose health/energy based on aggression and resource scarcity
+    damage_to_b = pop.base_aggression[a] * scale
+    damage_to_a = pop.base_aggression[b] * scale
+
+    # Sum every row's gains and losses in one scatter per column.
+    # Energy loss is half of health loss.
+    size = pop.size
+    gains = np.bincount(b, 0.1 - damage_to_b, size)
+    losses = np.bincount(a, damage_to_a, size)
+    health_delta = gains - losses
+    gains = np.bincount(a, 0.1 - damage_to_a / 2, size)
+    losses = np.bincount(b, damage_to_b / 2, size)
+    energy_delta = gains - losses
+
+    # Apply and clamp at zero in place on the gathered rows, then scatter back
+    rows = pop.alive_idx
+    for column, delta in ((pop.health, health_delta), (pop.energy, energy_delta)):
+        values = column[rows]
+        values += delta[rows]
+        np.maximum(values, 0.0, out=values)
+        column[rows] = values
+
+    # Note: Using debug level for frequent interaction logs to avoid overwhelming INFO level output
+    if logger.isEnabledFor(logging.DEBUG):
+        for row1, row2 in zip(a, b, strict=True):
+            entity1, entity2 = pop.entities[row1], pop.entities[row2]
+            logger.debug(
+                "Time %d: Interaction between %s and %s. "
+                "E1 Health:%.1f, E2 Health:%.1f",
+                sim.current_time,
+                entity1.id,
+                entity2.id,
+                entity1.health,
+                entity2.health,
+            )
 
 
 def handle_reproduction(sim):
     """
     Checks for thriving entities and potentially adds new offspring.
+    All of the epoch's random draws are made up front, in batches.
     """
-    new_entities = []
-    for entity in sim.entities:
-        if (
-            entity.status != "struggling"
-            and entity.age >= entity.parameters["min_reproduction_age"]
-            and random.random()
-            < entity.parameters["reproduction_chance"]
-            + sim.environment_factors["repoduction_rate"]
-        ):
-            offspring_params = entity.parameters.copy()
-            offspring_params = handle_mutation(sim, offspring_params)
-            offspring_params["initial_health"] = random.uniform(80, 100)
-            offspring_params["initial_energy"] = random.uniform(80, 100)
-
-            new_entity = Entity(offspring_params)
-            new_entities.append(new_entity)
-            sim.total_entities += 1
-            entity.health -= 3.0  # Parent loses some health after reproduction
+    pop = sim.population
+    rng = pop.rng
+    # Filter the living rows on the columns, so dead-but-unswept entities
+    # never get a roll
+    rows = pop.alive_idx
+    rolls = rng.random(rows.size)
+    eligible = (
+        (pop.status[rows] != STRUGGLING)
+        & (pop.age[rows] >= pop.min_reproduction_age[rows])
+        & (rolls < pop.base_reproduction_chance[rows] + sim.env.repoduction_rate)
+    )
+    parent_rows = rows[eligible]
+    parents = [pop.entities[row] for row in parent_rows]
+    if not parents:
+        return
 
-            event_tracker(
-                "birth",
-                entity=entity,
-                new_entity=new_entity,
-                time=sim.current_time,
-            )
+    # One row of mutation gates/deltas and starting stats per offspring
+    strength = sim.env.mutation_strength
+    shape = (len(parents), len(_MUTABLE_NAMES))
+    gates = rng.random(shape)
+    deltas = rng.uniform(-strength, strength, shape)
+    initial_stats = rng.uniform(80, 100, (len(parents), 2))
+
+    # Mutate every offspring's parameters in a single kernel call
+    offspring = mutate_batch(
+        sim, [entity.parameters for entity in parents], gates, deltas
+    )
+
+    pop.reserve(len(parents))
+    new_entities = [pop.acquire(offspring_params) for offspring_params in offspring]
+    sim.total_entities += len(new_entities)
+    time = sim.current_time
+    track_events(
+        "birth",
+        [
+            (time, entity.id, new_entity.id, new_entity.name)
+            for entity, new_entity in zip(parents, new_entities, strict=True)
+        ],
+    )
 
+    # Starting stats and the parents' health cost go straight into the columns
+    pop.set_initial_stats(new_entities, initial_stats)
+    pop.health[parent_rows] -= 3.0  # Parent loses some health after reproduction
     sim.entities.extend(new_entities)
 
 
-def handle_efficiency_modifier(sim, population):
-    if population > sim.environment_factors["prosperity_threshold"]:
-        sim.environment_factors["growth_rate"] *= sim.environment_factors[
-            "prosperity_boost"
-        ]
+def handle_population_pressure(sim, population):
+    """
+    Applies the per-epoch density effects on the environment: the prosperity
+    and density efficiency boosts to growth, then the over-capacity penalties.
+    """
+    env = sim.env
+    if population > env.prosperity_threshold:
+        env.growth_rate *= env.prosperity_boost
 
     # Apply density-based efficiency modifier
-    efficiency = 1 + sim.environment_factors["density_efficiency"] * math.exp(
-        -((population - sim.environment_factors["optimal_density"]) ** 2) / 50000
+    efficiency = 1 + env.density_efficiency * math.exp(
+        -((population - env.optimal_density) ** 2) / 50000
     )
+    env.growth_rate *= efficiency
 
-    sim.environment_factors["growth_rate"] *= efficiency
-
-
-def handle_over_population(sim, population):
-    if population < sim.environment_factors["carrying_capacity"]:
+    if population < env.carrying_capacity:
         return  # Population is within sustainable limits
 
-    logger.info(
-        f"📢 {Back.magenta}Population pushing sustainable limits captain!{Style.reset}"
-    )
-    sim.environment_factors["growth_rate"] *= 0.85
-    sim.environment_factors["mutation_rate"] *= 1.1  # evolution speeds up
-    sim.environment_factors["interaction_strength"] *= (
-        1.1  # more competition when over capacity
-    )
-    sim.environment_factors["resource_availability"] *= 0.8
-    sim.environment_factors["pollution"] = min(
-        1.0, sim.environment_factors["pollution"] + 0.1
-    )
-    sim.environment_factors["temperature"] += 1.0
+    logger.info(_MSG_OVER_CAPACITY)
+    env.growth_rate *= 0.85
+    env.mutation_rate *= 1.1  # evolution speeds up
+    env.interaction_strength *= 1.1  # more competition when over capacity
+    env.resource_availability *= 0.8
+    env.pollution = min(1.0, env.pollution + 0.1)
+    env.temperature += 1.0
 
 
-def handle_mutation(sim, params: dict) -> dict:
+def mutate_batch(
+    sim, base_params: list[dict], gates: np.ndarray, deltas: np.ndarray
+) -> list[dict]:
     """
-    Applies slight random mutations to entity parameters.
+    Mutates a batch of parameter dicts in one mutate_kernel call, one row of
+    `gates`/`deltas` per dict. Returns one dict per input: a new dict where
+    anything mutated, otherwise the input itself; the inputs are untouched.
     """
-    mutated_params = params.copy()
-    mutation_rate = sim.environment_factors["mutation_rate"]
-    mutation_strength = sim.environment_factors["mutation_strength"]
-
-    # Parameters that can mutate and their bounds/types
-    mutable_parameters = {
-        "max_age": {"min": 50, "max": 99, "type": int},
-        "metabolism_rate": {"min": 0.2, "max": 0.9, "type": float},
-        "resilience": {"min": 0.2, "max": 0.8, "type": float},
-        "reproduction_chance": {"min": 0.01, "max": 0.15, "type": float},
-        "aggression": {"min": 0.0, "max": 0.9, "type": float},
-    }
-
-    for param_name, config in mutable_parameters.items():
-        if random.random() < mutation_rate:
-            original_value = mutated_params[param_name]
-            change = original_value * random.uniform(
-                -mutation_strength, mutation_strength
-            )
+    values = np.array(
+        [[params[name] for name in _MUTABLE_NAMES] for params in base_params],
+        dtype=np.float64,
+    )
+    mutated = mutate_kernel(
+        values,
+        _MUTABLE_MIN,
+        _MUTABLE_MAX,
+        _MUTABLE_IS_INT,
+        sim.env.mutation_rate,
+        gates,
+        deltas,
+    )
 
-            if config["type"] is int:
-                new_value = int(round(original_value + change))
-            else:  # float
-                new_value = original_value + change
-
-            # Apply bounds
-            new_value = max(config["min"], min(config["max"], new_value))
-            mutated_params[param_name] = new_value
-            event_tracker(
-                "mutation",
-                name=param_name,
-                original_value=original_value,
-                new_value=new_value,
-            )
+    # Record the events outside the kernel. Offspring share their parent's
+    # dict until their first mutation, which gets them a copy of their own.
+    offspring = list(base_params)
+    mutations = []
+    for r, i in zip(*np.nonzero(mutated), strict=True):
+        param_name = _MUTABLE_NAMES[i]
+        new_value = int(values[r, i]) if _MUTABLE_IS_INT[i] else float(values[r, i])
+        if offspring[r] is base_params[r]:
+            offspring[r] = base_params[r].copy()
+        offspring[r][param_name] = new_value
+        mutations.append((param_name, base_params[r][param_name], new_value))
+    track_events("mutation", mutations)
 
-    return mutated_params
+    return offspring
 
 
 def handle_baby_boom(sim, alive_count):
-    if random.random() > 0.2:  # 80% chance to trigger baby boom
+    if sim.population.rng.random() > 0.2:  # 80% chance to trigger baby boom
         return
 
     if (
-        alive_count > sim.environment_factors["optimal_density"]
+        alive_count > sim.env.optimal_density
         and sim.epoch_count < 16
         and sim.boom_count > 7
     ):
@@ -194,41 +233,40 @@ def handle_baby_boom(sim, alive_count):
     logger.info("\n👶 Baby Boom!")
     pause_simulation(20, desc="baby boom...", delay=0.05)
 
-    alive_count = len([e for e in sim.entities if e.is_alive()])
     num_new_babies = int(alive_count * 0.3) + 3  # At least 3 new babies
     num_new_babies = min(num_new_babies, 150)  # Cap at 150 new babies
 
     new_entities = []
-    thriving_alive_entities = [
-        e for e in sim.entities if e.is_alive() and e.status != "struggling"
-    ]
-    if thriving_alive_entities:
-        for _ in range(num_new_babies):
-            parent = random.choice(thriving_alive_entities)
-            offspring_params = parent.parameters.copy()
-            offspring_params["initial_health"] = random.uniform(80, 100)
-            offspring_params["initial_energy"] = random.uniform(80, 100)
-            new_entity = Entity(offspring_params)
+    pop = sim.population
+    alive = pop.alive_idx
+    thriving_alive = alive[pop.status[alive] != STRUGGLING]
+    if thriving_alive.size:
+        # Gather the chosen parents' parameter dicts in one pass
+        parent_params = [
+            pop.entities[row].parameters
+            for row in pop.rng.choice(thriving_alive, num_new_babies)
+        ]
+        initial_stats = pop.rng.uniform(80, 100, (num_new_babies, 2))
+        pop.reserve(num_new_babies)
+        for params in parent_params:
+            new_entity = pop.acquire(params)
             new_entities.append(new_entity)
             sim.total_entities += 1
+        pop.set_initial_stats(new_entities, initial_stats)
     else:
         logger.info("No thriving and alive entities available for baby boom event.")
 
     sim.entities.extend(new_entities)
-    sim.environment_factors["growth_rate"] *= 1.18
-    sim.environment_factors["mutation_rate"] *= 1.12  # evolution speeds up
-    sim.environment_factors["interaction_strength"] *= (
-        0.9  # less competition during expansion
-    )
-    sim.environment_factors["resource_availability"] = min(
-        1.0, sim.environment_factors["resource_availability"] + 0.15
+    sim.env.growth_rate *= 1.18
+    sim.env.mutation_rate *= 1.12  # evolution speeds up
+    sim.env.interaction_strength *= 0.9  # less competition during expansion
+    sim.env.resource_availability = min(
+        1.0, sim.env.resource_availability + 0.15
     )  # more resources during expansion
 
-    sim.environment_factors["temperature"] = max(
-        6.0, sim.environment_factors["temperature"] + 3.0
-    )  # warmer during expansion
-    sim.environment_factors["pollution"] = max(
-        0.0, sim.environment_factors["pollution"] + 0.1
+    sim.env.temperature = max(6.0, sim.env.temperature + 3.0)  # warmer during expansion
+    sim.env.pollution = max(
+        0.0, sim.env.pollution + 0.1
     )  # more pollution during expansion
 
     event_tracker(
@@ -0,0 +1,347 @@
+"""
+File: kernels.py
+Author: Jtk III
+Date: 2026-10-15
+Description: Numba-compiled numeric kernels for the per-epoch hot paths.
+"""
+
+import numpy as np
+from numba import njit, prange
+
+from entity import STATUS_CODES, Status
+
+DEAD = STATUS_CODES[Status.DEAD.value]
+THRIVING = STATUS_CODES[Status.THRIVING.value]
+STRUGGLING = STATUS_CODES[Status.STRUGGLING.value]
+ALIVE = STATUS_CODES[Status.ALIVE.value]
+DORMANT = STATUS_CODES[Status.DORMANT.value]
+
+
+@njit(cache=True, fastmath=True)
+def _status_code(
+    health,
+    energy,
+    age,
+    max_age,
+    thriving_health,
+    thriving_energy,
+    struggling_health,
+    struggling_energy,
+):
+    """Status code for one row's health, energy and age."""
+    if health <= 0 or age >= max_age:
+        return DEAD
+    if health >= thriving_health and energy >= thriving_energy:
+        return THRIVING
+    if health <= struggling_health or energy <= struggling_energy:
+        return STRUGGLING
+    return ALIVE
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def update_status_kernel(
+    health,
+    energy,
+    age,
+    max_age,
+    status,
+    alive,
+    thriving_health,
+    thriving_energy,
+    struggling_health,
+    struggling_energy,
+):
+    """
+    Sets status and alive flag for every row from its health, energy and age.
+    Dead rows also have their health and energy zeroed.
+    """
+    for i in prange(health.shape[0]):
+        status[i] = _status_code(
+            health[i],
+            energy[i],
+            age[i],
+            max_age[i],
+            thriving_health,
+            thriving_energy,
+            struggling_health,
+            struggling_energy,
+        )
+        alive[i] = status[i] != DEAD
+        if not alive[i]:
+            health[i] = 0.0
+            energy[i] = 0.0
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def process_kernel(
+    health,
+    energy,
+    age,
+    max_age,
+    status,
+    alive,
+    metabolism_rate,
+    foraging_efficiency,
+    recovery_rate,
+    decay_rate,
+    resilience,
+    rows,
+    resource_availability,
+    temperature,
+    pollution,
+    radiation,
+    death_rate,
+    thriving_health,
+    thriving_energy,
+    struggling_health,
+    struggling_energy,
+):
+    """
+    One fused pass of process_entities over the given rows: ages each row,
+    applies its energy then health change for this epoch's environment,
+    clamps both to [0, 100] and sets its status, all while the row is hot.
+    """
+    for j in prange(rows.shape[0]):
+        i = rows[j]
+        age[i] += 1
+
+        # Energy: metabolism cost (base + health penalty) against foraging
+        consumed = metabolism_rate[i]
+        if health[i] < 50.0:
+            consumed += (50.0 - health[i]) * 0.1
+        if resource_availability < 1.0:  # Starvation penalty
+            consumed += (1.0 - resource_availability) * 5.0
+        gained = resource_availability * foraging_efficiency[i] * 1.8
+        energy[i] = max(0.0, min(energy[i] + gained - consumed, 100.0))
+
+        # Health: reads the energy just updated
+        if health[i] >= 95.0:  # No more gain near full health; just base decay
+            change = -0.005
+        else:
+            change = -0.005  # Base decay
+            decay = decay_rate[i]
+            if radiation > 0.2:  # Radiation increases decay
+                decay += (radiation - 0.2) * (1.5 - resilience[i]) * 0.5
+            if energy[i] > 50.0:
+                change += (energy[i] - 50.0) * recovery_rate[i] * 0.1
+            else:
+                change -= (50.0 - energy[i]) * decay * 0.1
+            if temperature < 10.0 or temperature > 35.0:  # Temperature penalty
+                change -= abs(temperature - 22.5) * (1.0 - resilience[i]) * 0.1
+            if pollution > 0.1:  # Pollution penalty
+                change -= pollution * (1.3 - resilience[i]) * 3.0
+            # Finally just age-related decay, exponential with age
+            change -= 0.5 * float(age[i]) ** death_rate
+        health[i] = max(0.0, min(health[i] + change, 100.0))
+
+        status[i] = _status_code(
+            health[i],
+            energy[i],
+            age[i],
+            max_age[i],
+            thriving_health,
+            thriving_energy,
+            struggling_health,
+            struggling_energy,
+        )
+        alive[i] = status[i] != DEAD
+        if not alive[i]:
+            health[i] = 0.0
+            energy[i] = 0.0
+
+
+@njit(cache=True, fastmath=True)
+def feedback_kernel(
+    population,
+    carrying_capacity,
+    resource_availability,
+    pollution,
+    mutation_rate,
+    radiation_background,
+    disaster_chance,
+    disaster_impact,
+):
+    """
+    Scalar core of apply_feedback_loops. Returns the updated
+    (carrying_capacity, resource_availability, pollution, mutation_rate,
+    disaster_chance, disaster_impact).
+    """
+    # Resource feedback
+    pressure = population / (carrying_capacity + 1)
+    resource_availability *= 1 - 0.1 * pressure
+    resource_availability = max(resource_availability, 0.05)
+
+    # Pollution feedback
+    pollution_change = 0.05 * pressure - 0.02 * (1 - pressure)
+    pollution = max(0.0, min(pollution + pollution_change, 1.0))
+
+    # Mutation pressure feedback
+    mutation_rate *= 1 + 0.1 * radiation_background
+    mutation_rate = min(mutation_rate, 1.0)
+
+    # Carrying capacity evolution
+    if pressure > 0.8:
+        carrying_capacity *= 0.995
+    elif 0.3 < pressure < 0.6:
+        carrying_capacity *= 1.002
+    carrying_capacity = max(50.0, min(carrying_capacity, 10000.0))
+
+    # Disaster & event feedback
+    disaster_chance = min(disaster_chance + 0.01 * pollution, 1.0)
+    disaster_impact = min(disaster_impact + 0.01 * radiation_background, 1.0)
+
+    return (
+        carrying_capacity,
+        resource_availability,
+        pollution,
+        mutation_rate,
+        disaster_chance,
+        disaster_impact,
+    )
+
+
+@njit(cache=True, fastmath=True)
+def drift_kernel(progress, event_chance, interaction_strength, mutation_rate):
+    """
+    Scalar core of update_environment. `progress` is current_time / epochs.
+    Returns the updated (resource_availability, temperature, pollution,
+    event_chance, interaction_strength, mutation_rate).
+    """
+    return (
+        max(0.1, 1.0 - progress * 0.5),  # Gradual changes over time
+        25.0 + 10 * (progress - 0.5),  # Oscillates
+        min(0.8, progress * 0.3),  # Gradual increase in pollution over time
+        min(0.1, event_chance + 0.001),
+        min(1.0, interaction_strength + 0.001),
+        min(0.3, mutation_rate + 0.0005),
+    )
+
+
+@njit(cache=True, fastmath=True)
+def mutate_kernel(values, mins, maxs, is_int, mutation_rate, gate, delta):
+    """
+    Mutate a batch of parameter rows in place. `values`, `gate` and `delta`
+    are (offspring, params); `mins`, `maxs` and `is_int` hold one entry per
+    param column. Entry [r, i] mutates when gate[r, i] < mutation_rate,
+    shifting by values[r, i] * delta[r, i], rounding integer traits and
+    clamping to [mins[i], maxs[i]]. Returns a mask of the entries that mutated.
+    """
+    mutated = gate < mutation_rate
+    for r in range(values.shape[0]):
+        for i in range(values.shape[1]):
+            if mutated[r, i]:
+                new_value = values[r, i] + values[r, i] * delta[r, i]
+                if is_int[i]:
+                    new_value = np.round(new_value)
+                values[r, i] = max(mins[i], min(maxs[i], new_value))
+    return mutated
+
+
+@njit(cache=True, fastmath=True)
+def adapt_kernel(
+    resilience,
+    metabolism_rate,
+    reproduction_chance,
+    aggression,
+    foraging_efficiency,
+    rows,
+    avg_condition,
+    drift,
+    leap,
+    leap_factor,
+):
+    """
+    Core of adapt_entities over the trait columns, for the given rows.
+    Applies the scarcity/abundance adaptation for each row's average
+    remembered condition, then its drift and (on a leap) its leap factor,
+    and clamps every trait to its bounds. All randoms are passed in.
+    """
+    for i in range(rows.shape[0]):
+        r = rows[i]
+        scale = drift[i]
+        if leap[i]:
+            scale *= leap_factor[i]
+
+        if avg_condition[i] < -0.1:  # Scarcity = survival traits
+            res, met, rep, agg, forg = 1.02, 0.97, 0.93, 1.01, 1.03
+        elif avg_condition[i] > 0.1:  # Abundance = growth traits
+            res, met, rep, agg, forg = 0.97, 1.03, 1.07, 0.99, 0.97
+        else:
+            res, met, rep, agg, forg = 1.0, 1.0, 1.0, 1.0, 1.0
+
+        resilience[r] = max(0.1, min(resilience[r] * res * scale, 5.0))
+        metabolism_rate[r] = max(0.1, min(metabolism_rate[r] * met * scale, 5.0))
+        reproduction_chance[r] = max(
+            0.001, min(reproduction_chance[r] * rep * scale, 2.0)
+        )
+        aggression[r] = max(0.0, min(aggression[r] * agg * scale, 1.0))
+        foraging_efficiency[r] = max(
+            0.1, min(foraging_efficiency[r] * forg * scale, 5.0)
+        )
+
+
+def warm_up_kernels() -> None:
+    """Compile (or load from cache) every kernel before the first epoch."""
+    one = np.ones(1, dtype=np.float32)
+    ages = np.zeros(1, dtype=np.int32)
+    update_status_kernel(
+        one.copy(),
+        one.copy(),
+        ages,
+        ages + 1,
+        np.zeros(1, dtype=np.int8),
+        np.ones(1, dtype=np.bool_),
+        65.0,
+        60.0,
+        33.0,
+        22.0,
+    )
+    process_kernel(
+        one.copy(),
+        one.copy(),
+        ages.copy(),
+        ages + 1,
+        np.zeros(1, dtype=np.int8),
+        np.ones(1, dtype=np.bool_),
+        one,
+        one,
+        one,
+        one,
+        one,
+        np.zeros(1, dtype=np.intp),
+        1.0,
+        25.0,
+        0.1,
+        0.1,
+        1.0,
+        65.0,
+        60.0,
+        33.0,
+        22.0,
+    )
+    feedback_kernel(1.0, 1000.0, 1.0, 0.1, 0.1, 0.1, 0.1, 0.1)
+    drift_kernel(0.5, 0.03, 0.5, 0.1)
+    adapt_kernel(
+        one.copy(),
+        one.copy(),
+        one.copy(),
+        one.copy(),
+        one.copy(),
+        np.zeros(1, dtype=np.intp),
+        np.zeros(1),
+        np.ones(1),
+        np.zeros(1, dtype=np.bool_),
+        np.ones(1),
+    )
+    mutate_kernel(
+        np.ones((1, 1)),
+        np.zeros(1),
+        np.ones(1),
+        np.zeros(1, dtype=np.bool_),
+        0.5,
+        np.zeros((1, 1)),
+        np.zeros((1, 1)),
+    )
+
+
+# filepath: /home/jtk/Dev/TerminalLifeform/src/kernels.py
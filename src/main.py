@@ -5,34 +5,71 @@ Date: 2024-06-10
 Description: Entry point for the Terminal Lifeform simulation.
 """
 
+import argparse
 import os
-import sys
 
 from sim import Simulation
-from utils.world_loader import choose_world, load_world
+from utils.utils import clear_screen
+from utils.world_loader import add_mutant_worlds, choose_world, load_world
 
 
-def run_simulation(world_name: str):
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run a Terminal Lifeform simulation.")
+    parser.add_argument("world", nargs="?", help="world preset to run (skips the menu)")
+    parser.add_argument(
+        "--world", dest="world_option", help="same as the positional world"
+    )
+    parser.add_argument("--entities", type=int, default=120, help="starting entities")
+    parser.add_argument(
+        "--epochs", "--steps", type=int, default=150, help="epochs to simulate"
+    )
+    parser.add_argument("--seed", type=int, help="seed for a reproducible run")
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="skip the cosmetic pauses and per-entity logging",
+    )
+    return parser.parse_args(argv)
+
+
+def run_simulation(
+    world_name: str,
+    entities: int = 120,
+    epochs: int = 150,
+    seed=None,
+    headless: bool = False,
+):
     world = load_world(world_name)
-    my_simulation = Simulation(init_ents=120, epochs=150, world=world)
+    my_simulation = Simulation(
+        init_ents=entities,
+        epochs=epochs,
+        world=world,
+        seed=seed,
+        headless=headless or None,  # None defers to the world's own setting
+    )
     my_simulation.run_simulation()
 
 
 if __name__ == "__main__":
+    args = parse_args()
+    world_name = args.world_option or args.world
+    add_mutant_worlds()  # so mutant worlds can be picked by name too
+
+    if os.name == "nt":
+        os.system("")  # enables ANSI escape handling on Windows 10+ consoles
+
     while True:
-        if len(sys.argv) > 1:  # If a world name was provided, use it
-            world_name = sys.argv[1]
-        else:
-            os.system("cls" if os.name == "nt" else "clear")
-            world_name = choose_world()  # Otherwise, show the menu
+        if not world_name:  # Otherwise, show the menu
+            clear_screen()
+            world_name = choose_world()
 
-        run_simulation(world_name)
+        run_simulation(world_name, args.entities, args.epochs, args.seed, args.headless)
 
         again = input("\n❔ Run another simulation? (y/n): ").strip().lower()
         if again not in ("y", "yes"):  # Play again?
             print("\n 🖤 Allright then — until next evolution!\n")
             break
 
-        sys.argv = [sys.argv[0]]  # clear CLI arg if used previously
+        world_name = None  # clear CLI world if used previously
 
 # filepath: /home/jtk/Dev/TerminalLifeform/src/main.py
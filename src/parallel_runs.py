@@ -0,0 +1,101 @@
+"""
+File: parallel_runs.py
+Author: Jtk III
+Date: 2026-10-15
+Description: Runs many independent simulations side by side, one per process.
+"""
+
+import argparse
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from sim import Simulation
+from stats import set_write_lock
+from utils.logging_config import setup_worker_logging
+from utils.world_loader import add_mutant_worlds, load_world
+
+
+def _init_worker(lock) -> None:
+    """
+    Share one lock across workers so the stats files are written in turn,
+    and give each worker its own quieter log file.
+    """
+    set_write_lock(lock)
+    setup_worker_logging()
+    add_mutant_worlds()  # so mutant worlds can be picked by name too
+
+
+def run_one(world_name: str, seed=None, entities: int = 120, epochs: int = 150):
+    """Run a single headless simulation and return its final totals."""
+    world = load_world(world_name)
+    sim = Simulation(world, init_ents=entities, epochs=epochs, seed=seed, headless=True)
+    totals = sim.run_simulation()
+    totals["seed"] = seed
+    return totals
+
+
+def run_many(
+    worlds: list[str],
+    n_runs: int = 1,
+    n_workers: int | None = None,
+    entities: int = 120,
+    epochs: int = 150,
+    seed: int | None = None,
+) -> list[dict]:
+    """
+    Run every world n_runs times across a pool of worker processes.
+
+    Runs are independent, so they spread over n_workers processes (by
+    default one per core, but never more than there are runs).
+    With a base `seed`, repeat i of each world uses seed + i, so the whole
+    batch is reproducible. Returns the final totals of each run, in order.
+    """
+    jobs = [
+        (world, None if seed is None else seed + i)
+        for world in worlds
+        for i in range(n_runs)
+    ]
+    n_workers = max(1, min(n_workers or os.cpu_count() or 1, len(jobs)))
+    lock = multiprocessing.Lock()
+    with ProcessPoolExecutor(
+        n_workers, initializer=_init_worker, initargs=(lock,)
+    ) as pool:
+        futures = [
+            pool.submit(run_one, world, run_seed, entities, epochs)
+            for world, run_seed in jobs
+        ]
+        return [future.result() for future in futures]
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Run many Terminal Lifeform simulations in parallel."
+    )
+    parser.add_argument("worlds", nargs="+", help="world presets to run")
+    parser.add_argument("--runs", type=int, default=1, help="runs per world")
+    parser.add_argument("--workers", type=int, help="worker processes (default: cores)")
+    parser.add_argument("--entities", type=int, default=120, help="starting entities")
+    parser.add_argument(
+        "--epochs", "--steps", type=int, default=150, help="epochs to simulate"
+    )
+    parser.add_argument("--seed", type=int, help="base seed for reproducible runs")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = run_many(
+        args.worlds, args.runs, args.workers, args.entities, args.epochs, args.seed
+    )
+
+    print(f"\n{'World Name':<25} {'Seed':<6} {'Alive End':<10} {'Max':<8} Births")
+    print("-" * 60)
+    for totals in results:
+        print(
+            f"{totals['world_name']:<25} {str(totals['seed']):<6} "
+            f"{totals['total_alive_at_conclusion']:<10} "
+            f"{totals['max_entities']:<8} {totals['total_births']}"
+        )
+
+# filepath: /home/jtk/Dev/TerminalLifeform/src/parallel_runs.py
@@ -0,0 +1,324 @@
+"""
+File: population.py
+Author: Jtk III
+Date: 2026-10-15
+Description: Structure-of-arrays storage for entity stats.
+"""
+
+import numpy as np
+
+from entity import STATUS_CODES, Entity
+from kernels import DEAD, STRUGGLING, update_status_kernel
+from params import make_entity_params
+
+# Per-entity columns and their dtypes. Stats are float32, counters are int32.
+COLUMNS = (
+    ("health", np.float32),
+    ("energy", np.float32),
+    ("age", np.int32),
+    ("max_age", np.int32),
+    ("resilience", np.float32),
+    ("foraging_efficiency", np.float32),
+    ("metabolism_rate", np.float32),
+    ("reproduction_chance", np.float32),
+    ("mutation_rate", np.float32),
+    ("aggression", np.float32),
+    ("base_aggression", np.float32),
+    ("base_metabolism_rate", np.float32),
+    ("base_resilience", np.float32),
+    ("base_foraging_efficiency", np.float32),
+    ("base_reproduction_chance", np.float32),
+    ("min_reproduction_age", np.int32),
+    ("memory_len", np.int32),
+    ("memory_sum", np.float64),  # running total of the remembered conditions
+    ("cooperation", np.float32),
+    ("health_recovery_rate", np.float32),
+    ("health_decay_rate", np.float32),
+    ("x", np.int32),
+    ("y", np.int32),
+    ("status", np.int8),
+    ("alive", np.bool_),
+)
+
+# Columns that mirror an entity's inherited parameters (column, parameter key).
+# They are written once on reset, so hot paths skip the dict lookups.
+PARAMETER_COLUMNS = (
+    ("max_age", "max_age"),
+    ("base_aggression", "aggression"),
+    ("base_metabolism_rate", "metabolism_rate"),
+    ("base_resilience", "resilience"),
+    ("base_foraging_efficiency", "foraging_efficiency"),
+    ("base_reproduction_chance", "reproduction_chance"),
+    ("min_reproduction_age", "min_reproduction_age"),
+)
+
+# How many environment readings each entity remembers
+MEMORY_SPAN = 20
+
+
+class Population:
+    """
+    Holds every entity's stats as parallel NumPy columns.
+
+    Entity objects are thin handles onto a row, so per-epoch passes can work
+    on whole columns at once instead of looping over Python objects.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 256,
+        entity_params: dict | None = None,
+        seed: int | None = None,
+    ):
+        self.capacity = capacity
+        # Default parameters shared by this population's entities, drawn
+        # fresh per population so separate runs never alias them
+        self.entity_params = entity_params or make_entity_params()
+        self.size = 0  # rows handed out so far
+        self.entities = []  # Entity handle for each row
+        self.free = []  # rows released by dead entities, ready for reuse
+        self.rng = np.random.default_rng(seed)
+        self._alive_idx = None  # cached row indices, see invalidate()
+        self._struggling_idx = None
+
+        for name, dtype in COLUMNS:
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+        # Environment memory ring buffer, one row per entity. A row's next
+        # slot is memory_len % MEMORY_SPAN; unwritten slots stay zero.
+        self.memory = np.zeros((capacity, MEMORY_SPAN), dtype=np.float32)
+
+        # Status thresholds are shared by every entity
+        self.thriving_health = self.entity_params["thriving_threshold_health"]
+        self.thriving_energy = self.entity_params["thriving_threshold_energy"]
+        self.struggling_health = self.entity_params["struggling_threshold_health"]
+        self.struggling_energy = self.entity_params["struggling_threshold_energy"]
+
+    def acquire(self, initial_parameters: dict = None) -> Entity:  # type: ignore
+        """
+        Return a fresh entity, recycling a released row and its handle when
+        one is available instead of allocating a new one.
+        """
+        if self.free:
+            entity = self.entities[self.free.pop()]
+            entity.reset(initial_parameters)
+            return entity
+        return Entity(self, initial_parameters)
+
+    def release(self, entity: Entity) -> None:
+        """Return a dead entity's row to the pool."""
+        self.alive[entity.index] = False
+        self.free.append(entity.index)
+        self.invalidate()
+
+    def allocate(self, entity) -> int:
+        """Reserve a row for a new entity and return its index."""
+        if self.size == self.capacity:
+            self._grow(self.capacity * 2)
+        row = self.size
+        self.size += 1
+        self.entities.append(entity)
+        self.alive[row] = True
+        self.invalidate()
+        return row
+
+    def reserve(self, n: int) -> None:
+        """
+        Make room for n more entities up front, so a batch of births grows
+        the columns at most once instead of doubling repeatedly mid-batch.
+        """
+        needed = self.size + max(0, n - len(self.free))
+        if needed > self.capacity:
+            self._grow(max(needed, self.capacity * 2))
+
+    def set_initial_stats(self, entities: list, stats: np.ndarray) -> None:
+        """Write a batch of newborns' starting (health, energy) pairs at once."""
+        rows = [entity.index for entity in entities]
+        self.health[rows] = stats[:, 0]
+        self.energy[rows] = stats[:, 1]
+
+    def load_parameters(self, row: int, parameters: dict) -> None:
+        """Copy the inherited parameters for one row into their mirror columns."""
+        for column, key in PARAMETER_COLUMNS:
+            getattr(self, column)[row] = parameters[key]
+
+    def _grow(self, capacity: int) -> None:
+        for name, dtype in COLUMNS:
+            column = np.zeros(capacity, dtype=dtype)
+            column[: self.size] = getattr(self, name)[: self.size]
+            setattr(self, name, column)
+        memory = np.zeros((capacity, MEMORY_SPAN), dtype=np.float32)
+        memory[: self.size] = self.memory[: self.size]
+        self.memory = memory
+        self.capacity = capacity
+
+    def remember(self, rows: np.ndarray | int, condition: float) -> None:
+        """Record this epoch's condition in each row's memory, evicting the oldest."""
+        slots = self.memory_len[rows] % MEMORY_SPAN
+        condition = np.float32(condition)  # add exactly what the buffer stores
+        # Unwritten slots are zero, so the eviction term is free while filling
+        self.memory_sum[rows] += condition - self.memory[rows, slots]
+        self.memory[rows, slots] = condition
+        self.memory_len[rows] += 1
+
+    def forget(self, rows: np.ndarray | int) -> None:
+        """Wipe the environment memory of the given rows."""
+        self.memory[rows] = 0.0
+        self.memory_len[rows] = 0
+        self.memory_sum[rows] = 0.0
+
+    def memory_average(self, rows: np.ndarray) -> np.ndarray:
+        """Mean remembered condition per row (0.0 for an empty memory)."""
+        count = np.minimum(self.memory_len[rows], MEMORY_SPAN)
+        return self.memory_sum[rows] / np.maximum(count, 1)
+
+    def recall(self, row: int) -> list[float]:
+        """One row's remembered conditions, oldest first."""
+        n = int(self.memory_len[row])
+        if n <= MEMORY_SPAN:
+            return self.memory[row, :n].tolist()
+        return np.roll(self.memory[row], -(n % MEMORY_SPAN)).tolist()
+
+    def invalidate(self) -> None:
+        """Drop the cached row indices after the alive/status columns change."""
+        self._alive_idx = None
+        self._struggling_idx = None
+
+    @property
+    def alive_idx(self) -> np.ndarray:
+        """Indices of all living rows, cached until the next status change."""
+        if self._alive_idx is None:
+            self._alive_idx = np.flatnonzero(self.alive[: self.size])
+        return self._alive_idx
+
+    @property
+    def struggling_idx(self) -> np.ndarray:
+        """Indices of living rows that are struggling, cached like alive_idx."""
+        if self._struggling_idx is None:
+            self._struggling_idx = np.flatnonzero(
+                self.alive[: self.size] & (self.status[: self.size] == STRUGGLING)
+            )
+        return self._struggling_idx
+
+    def alive_count(self) -> int:
+        return int(self.alive_idx.size)
+
+    def count_status(self, code: int) -> int:
+        """Number of living rows with the given status code."""
+        rows = self.alive_idx
+        return int(np.count_nonzero(self.status[rows] == code))
+
+    def status_counts(self) -> np.ndarray:
+        """Living rows per status code in one pass, indexed by code."""
+        rows = self.alive_idx
+        return np.bincount(self.status[rows], minlength=len(STATUS_CODES))
+
+    def sample_alive(self, k: int) -> np.ndarray:
+        """Pick up to k distinct living rows at random."""
+        rows = self.alive_idx
+        return self.rng.choice(rows, size=min(k, rows.size), replace=False)
+
+    def kill(self, rows: np.ndarray | int) -> None:
+        """Mark the given rows dead in one batch, invalidating the caches once."""
+        self.health[rows] = 0.0
+        self.energy[rows] = 0.0
+        self.status[rows] = DEAD
+        self.alive[rows] = False
+        self.invalidate()
+
+    def pick_partners(self, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Pair every living row with up to k (at most 3) distinct other living
+        rows. Returns parallel (rows, partners) arrays, k entries per row.
+        """
+        rows = self.alive_idx
+        n = rows.size
+        k = min(k, n - 1, 3)
+        if k <= 0:
+            empty = np.empty(0, dtype=np.intp)
+            return empty, empty
+
+        # Distinct offsets in [0, n - 1) per row, drawn without replacement
+        # by shifting each draw past the ones already taken
+        m = n - 1
+        offsets = np.empty((n, k), dtype=np.intp)
+        offsets[:, 0] = self.rng.integers(0, m, size=n)
+        if k > 1:
+            second = self.rng.integers(0, m - 1, size=n)
+            second += second >= offsets[:, 0]
+            offsets[:, 1] = second
+        if k > 2:
+            low = np.minimum(offsets[:, 0], offsets[:, 1])
+            high = np.maximum(offsets[:, 0], offsets[:, 1])
+            third = self.rng.integers(0, m - 2, size=n)
+            third += third >= low
+            third += third >= high
+            offsets[:, 2] = third
+
+        # Offset 1..n-1 from each row's own position, so nobody picks itself
+        positions = (np.arange(n)[:, None] + 1 + offsets) % n
+        return np.repeat(rows, k), rows[positions].ravel()
+
+    def pick_neighbours(self, k: int, radius: float) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Like pick_partners, but partners come from within `radius` of each
+        row, found through a uniform grid of radius-sized cells. Each of the
+        k draws picks a random cell of the surrounding 3x3 block and a random
+        row in it; draws that land on an empty cell, the row itself, a repeat
+        or a row farther than `radius` away are dropped, so isolated rows get
+        fewer partners (or none).
+        """
+        rows = self.alive_idx
+        if rows.size < 2:
+            empty = np.empty(0, dtype=np.intp)
+            return empty, empty
+
+        # Cell key per row, padded by one cell on each side so the 3x3
+        # offsets below never wrap into another column of cells
+        x = self.x[rows].astype(np.int64)
+        y = self.y[rows].astype(np.int64)
+        cx = (x / radius).astype(np.int64)
+        cy = (y / radius).astype(np.int64)
+        ny = int(cy.max()) + 3
+        keys = (cx + 1) * ny + (cy + 1)
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+
+        # k draws per row: a neighbouring cell, then a row inside it
+        src = np.repeat(np.arange(rows.size), k)
+        dx, dy = self.rng.integers(-1, 2, (2, src.size))
+        wanted = keys[src] + dx * ny + dy
+        start = np.searchsorted(sorted_keys, wanted, "left")
+        count = np.searchsorted(sorted_keys, wanted, "right") - start
+        hit = count > 0
+        src, start, count = src[hit], start[hit], count[hit]
+        dst = order[start + (self.rng.random(src.size) * count).astype(np.int64)]
+
+        dist2 = (x[src] - x[dst]) ** 2 + (y[src] - y[dst]) ** 2
+        keep = (src != dst) & (dist2 <= radius * radius)
+        pairs = np.unique(np.stack((src[keep], dst[keep])), axis=1)
+        return rows[pairs[0]], rows[pairs[1]]
+
+    def update_status(self, rows: slice | None = None) -> None:
+        """
+        Updates status for a slice of rows (all rows by default) based on their
+        current health, energy and age.
+        """
+        if rows is None:
+            rows = slice(0, self.size)
+
+        update_status_kernel(
+            self.health[rows],
+            self.energy[rows],
+            self.age[rows],
+            self.max_age[rows],
+            self.status[rows],
+            self.alive[rows],
+            self.thriving_health,
+            self.thriving_energy,
+            self.struggling_health,
+            self.struggling_energy,
+        )
+        self.invalidate()
+
+
+# filepath: /home/jtk/Dev/TerminalLifeform/src/population.py
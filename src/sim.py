@@ -5,150 +5,222 @@ Date: 2024-06-10
 Description: Core simulation engine for Terminal Lifeform.
 """
 
+import logging
 import random
 import time
+from collections import deque
+from itertools import compress
+from operator import attrgetter
 
-from colored import Back, Fore, Style
+import numpy as np
 from tqdm import tqdm
 
-from entity import Entity
 from enviroment import (
+    EnvFactors,
     adapt_environment,
     apply_feedback_loops,
     handle_enviroment_memory,
     update_environment,
 )
 from events import (
+    seed_events,
     trigger_natural_disaster,
     trigger_predator_event,
     trigger_random_events,
 )
 from handlers import (
     handle_baby_boom,
-    handle_efficiency_modifier,
     handle_interactions,
-    handle_mutation,
-    handle_over_population,
+    handle_population_pressure,
     handle_reproduction,
 )
+from kernels import STRUGGLING, THRIVING, warm_up_kernels
+from population import Population
 from stats import (
-    event_tracker,
+    final_totals,
     record_trait_snapshot,
+    reset_tracking,
     save_trait_history,
+    track_events,
     update_global_trait_tracker,
     update_totals,
 )
-from utils.entity_utils import adapt_entities, add_entity, move_entity, process_entity
+from utils.ansi import Back, Fore, Style
+from utils.entity_utils import (
+    adapt_entities,
+    add_entity,
+    move_entities,
+    process_entities,
+)
 from utils.logging_config import setup_logger
-from utils.utils import pause_simulation, time_passes
+from utils.utils import pause_simulation, set_headless, time_passes
 
 logger = setup_logger(__name__)
 
+# Per-epoch log templates with the colors baked in, %-formatted lazily
+_MSG_EPOCH = "\n--- Epoch %d ---"
+_MSG_ENVIRONMENT = (
+    Fore.blue + "Resources:%.2f,  Temp:%.1fC, Pollution:%.2f " + Style.reset
+)
+_MSG_POPULATION = (
+    " " + Back.magenta + "Alive=%d, Thriving=%d, Struggling=%d" + Style.reset
+)
+# Headless runs only log the environment line every this many epochs
+HEADLESS_LOG_EVERY = 10
+
 
 class Simulation:
     """
     Manages the overall simulation, including entities, time, and environment.
     """
 
-    def __init__(self, world, init_ents=5, epochs=1000):
+    def __init__(self, world, init_ents=5, epochs=1000, seed=None, headless=None):
+        self.seed = seed
+        reset_tracking()  # totals and trait history are per run
+        if seed is not None:  # seed every generator before anything draws
+            random.seed(seed)
+        # Always reseed the event generator: with no seed it draws fresh OS
+        # entropy, so forked workers never replay their parent's event rolls
+        seed_events(seed)
+
         self.entities = []
+        self.population = Population(capacity=max(256, init_ents * 2), seed=seed)
         self.current_time = 0
         self.total_entities = 0
         self.epochs = epochs
         self.max_entities = 0
         self.epoch_count = 0
         self.boom_count = 0
-        self.drift = random.uniform(0.95, 1.05)
+        self.drift = self.population.rng.uniform(0.95, 1.05)
         self.last_boom_epoch = -20  # Ensure first boom can happen after 20 epochs
-        self.population_history: list[int] = []
         self.memory_window: int = 17  # how many epochs back the world 'remembers'
         self.memory_window = world.get("memory_window", 50)
         self.memory_sensitivity = world.get("memory_sensitivity", 1.1)
+        # Bounded history plus a running sum so the average is O(1)
+        self.population_history: deque[int] = deque(maxlen=self.memory_window)
+        self.pop_history_sum = 0
+        # Headless runs skip the human-paced sleeps and per-entity logging
+        if headless is None:
+            headless = world.get("headless", False)
+        self.headless = headless
+        set_headless(headless)
 
         if isinstance(world, dict):
-            self.environment_factors = world.copy()
+            self.env = EnvFactors.from_world(world)
             self.world_name = world.get("name", "default")
             self.world_description = world.get("description", "")
         else:
             raise ValueError("Simulation 'world' parameter must be a dict")
 
+        warm_up_kernels()
         for _ in range(init_ents):
-            add_entity(self, Entity())
+            add_entity(self, self.population.acquire())
+
+        logger.info("Simulation initialized with %d entities.", len(self.entities))
+
+    def record_population(self, alive_count: int) -> None:
+        """
+        Appends this epoch's population to the bounded history, keeping the
+        running sum in step with whatever the deque evicts.
+        """
+        if len(self.population_history) == self.population_history.maxlen:
+            self.pop_history_sum -= self.population_history[0]
+        self.population_history.append(alive_count)
+        self.pop_history_sum += alive_count
+
+    def sweep_dead(self, t: int) -> None:
+        """
+        Drops the entities whose rows died this epoch, keeping the survivors
+        in order. Liveness is read from the alive column in one gather, so
+        only the dead are visited in Python, to record and release them.
+        """
+        entities = self.entities
+        pop = self.population
+        rows = np.fromiter(map(attrgetter("index"), entities), np.intp, len(entities))
+        alive = pop.alive[rows]
+        dead = np.flatnonzero(~alive)
+        if not dead.size:
+            return
+
+        deaths = []
+        for position in dead:
+            entity = entities[position]
+            deaths.append((entity.id, entity.name, entity.age, t))
+            pop.release(entity)
+        entities[:] = compress(entities, alive)  # in place, order preserved
+        track_events("death", deaths)
 
-        logger.info(f"Simulation initialized with {len(self.entities)} entities.")
+    def log_environment(self) -> None:
+        """Logs the epoch's environment, only every few epochs when headless."""
+        if self.headless and self.current_time % HEADLESS_LOG_EVERY:
+            return
+        logger.info(
+            _MSG_ENVIRONMENT,
+            self.env.resource_availability,
+            self.env.temperature,
+            self.env.pollution,
+        )
 
-    def run_simulation(self):
+    def run_simulation(self) -> dict:
         """
         Runs the simulation for the specified number of Epochs.
+        Returns a copy of the run's final totals.
         """
 
-        logger.info(f"\n🌍 Terminal Lifeform running {self.world_name} world")
+        logger.info("\n🌍 Terminal Lifeform running %s world", self.world_name)
         pause_simulation(20, desc="init term lifeform...", delay=0.05)
 
         # Main simulation loop
-        for t in tqdm(range(self.epochs), desc="Terminal Lifeform Progress"):
+        epochs = tqdm(
+            range(self.epochs), desc="Terminal Lifeform Progress", disable=self.headless
+        )
+        for t in epochs:
             self.current_time = t
             self.epoch_count += 1
-            logger.info(f"\n--- Epoch {self.current_time} ---")
-            time.sleep(0.33)  # Simulate time passing
+            logger.info(_MSG_EPOCH, self.current_time)
+            if not self.headless:
+                time.sleep(0.33)  # Simulate time passing
 
             trigger_random_events(self)
             trigger_predator_event(self, severity=0.3)
             trigger_natural_disaster(self, severity=0.25)
 
-            logger.info(
-                f"{Fore.blue}Resources:{self.environment_factors['resource_availability']:.2f},  "
-                f"Temp:{self.environment_factors['temperature']:.1f}C, \
-                 Pollution:{self.environment_factors['pollution']:.2f} {Style.reset}"
-            )
+            self.log_environment()
 
             time_passes(0.75)  # Simulate time passing
 
-            # First pass: process each entity
-            for entity in self.entities:
-                process_entity(self, entity)  # Process each entity individually
-                move_entity(entity)  # Random movement in the world
-                if entity.environment_memory:
-                    handle_enviroment_memory(entity, self.drift)
+            # First pass: process every entity
+            process_entities(self)  # Age, feed and heal every entity at once
+            move_entities(self)  # Random movement in the world
+            handle_enviroment_memory(self)  # Memory-driven drift, all rows at once
 
-            handle_mutation(self, entity.parameters)
             handle_interactions(self)  # interactions between entities
             handle_reproduction(self)
             adapt_entities(self)  # Phenotypic plasticity: short-term adaptation
 
             # Second pass: update status and clean up dead entities
-            for entity in self.entities:
-                entity.update_status()  # Re-update status after interactions
-                if entity.is_alive():
-                    logger.info(f"{entity}")
-                else:
-                    event_tracker(
-                        "death",
-                        entity=entity,
-                        time=self.current_time,
-                    )
-
-            self.entities = [entity for entity in self.entities if entity.is_alive()]
+            self.population.update_status()  # Re-update status after interactions
+            self.sweep_dead(t)
+            log_entities = not self.headless and logger.isEnabledFor(logging.INFO)
+            if log_entities and self.entities:  # one record for the whole roll call
+                logger.info("%s", "\n".join(map(str, self.entities)))
 
             alive_count = len(self.entities)
-            self.population_history.append(alive_count)
+            self.record_population(alive_count)
 
-            thriving_count = sum(1 for e in self.entities if e.status == "thriving")
-            struggling_count = sum(1 for e in self.entities if e.status == "struggling")
+            status_counts = self.population.status_counts()
+            thriving_count = int(status_counts[THRIVING])
+            struggling_count = int(status_counts[STRUGGLING])
 
             if alive_count == 0:
-                logger.info(f"{Back.magenta}They're All Dead Jim{Style.reset}")
+                logger.info("%sThey're All Dead Jim%s", Back.magenta, Style.reset)
                 break
             else:
-                handle_efficiency_modifier(self, alive_count)
-                handle_over_population(self, alive_count)
+                handle_population_pressure(self, alive_count)
 
                 if alive_count > self.max_entities:
                     self.max_entities = alive_count
 
-                if len(self.population_history) > self.memory_window:
-                    self.population_history.pop(0)  # keep memory bounded
-
                 # Only allow baby boom if last one was >10 loops ago
                 if (
                     not hasattr(self, "last_boom_epoch")
@@ -160,17 +232,19 @@ class Simulation:
                 else:
                     logger.info("Baby boom skipped: last boom was too recent.")
 
-                record_trait_snapshot(self.entities, self.epoch_count)
+                record_trait_snapshot(self.population, self.epoch_count)
                 update_environment(self)
                 apply_feedback_loops(self, alive_count)
                 adapt_environment(self)
 
                 logger.info(
-                    f" {Back.magenta}Alive={alive_count}, Thriving={thriving_count}, Struggling={struggling_count}{Style.reset}"
+                    _MSG_POPULATION, alive_count, thriving_count, struggling_count
                 )
 
         logger.info(
-            f"\n--- Simulation {self.world_name} Finished at Epoch {self.current_time} ---"
+            "\n--- Simulation %s Finished at Epoch %d ---",
+            self.world_name,
+            self.current_time,
         )
 
         save_trait_history()
@@ -185,3 +259,4 @@ class Simulation:
             struggling_count,
             thriving_count,
         )
+        return final_totals.copy()
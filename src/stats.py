@@ -5,14 +5,18 @@ Date: 2024-06-10
 Description: Statistics and logging for the simulation.
 """
 
+import contextlib
 import json
+import logging
 import os
 from datetime import datetime
 from pathlib import Path
 
-from colored import Back, Fore, Style
+import numpy as np
 
+from utils.ansi import Back, Fore, Style
 from utils.logging_config import setup_logger
+from utils.utils import clear_screen
 
 logger = setup_logger(__name__)
 PROJECT_ROOT = Path(__file__).resolve().parents[1]  # goes up from src/ to project root
@@ -22,6 +26,10 @@ TOTALS_FILE = LOGS_DIR / "sim_totals.json"
 
 trait_history = []  # store per-epoch trait snapshots
 
+# Guards the shared log files when several processes finish runs at once;
+# parallel_runs installs a real lock in each worker via set_write_lock()
+_write_lock = contextlib.nullcontext()
+
 final_totals = {
     "world_name": "",
     "run_id": "",
@@ -38,6 +46,40 @@ final_totals = {
 }
 
 
+def set_write_lock(lock) -> None:
+    """Serialize this process's writes to the shared log files with `lock`."""
+    global _write_lock
+    _write_lock = lock
+
+
+def reset_tracking() -> None:
+    """Clear the per-run counters and trait history before a new run."""
+    trait_history.clear()
+    for key, value in final_totals.items():
+        if isinstance(value, int):
+            final_totals[key] = 0
+
+
+def _label(text: str) -> str:
+    return Fore.green + text + Style.reset
+
+
+# End-of-run summary, %-formatted by the logger
+_MSG_FINAL_TOTALS = (
+    "\n"
+    "🌍 --- Final Totals for World: %s --- %s Epochs ---\n"
+    "📊 --- Run ID: %s ---\n"
+    f"🧬 {_label('Total Entities:')} %s, "
+    f"📈 {_label('Max Entities:')} %s, \n"
+    f"💀 {_label('Total Deaths:')} %s, "
+    f"👶 {_label('Total Births:')} %s, "
+    f"🔬 {_label('Total Mutations:')} %s, \n\n"
+    f"✅ {_label('Alive at Conclusion:')} %s, "
+    f"🌿 {_label('Thriving:')} %s, "
+    f"🫤 {_label('Struggling:')} %s"
+)
+
+
 def update_totals(
     epochs: int,
     max_entities: int,
@@ -64,17 +106,18 @@ def update_totals(
     )
 
     logger.info(
-        "\n"
-        f"🌍 --- Final Totals for World: {world_name} --- {epochs} Epochs ---\n"
-        f"📊 --- Run ID: {final_totals['run_id']} ---\n"
-        f"🧬 {Fore.green}Total Entities:{Style.reset} {total}, "
-        f"📈 {Fore.green}Max Entities:{Style.reset} {max_entities}, \n"
-        f"💀 {Fore.green}Total Deaths:{Style.reset} {final_totals['total_deaths']}, "
-        f"👶 {Fore.green}Total Births:{Style.reset} {final_totals['total_births']}, "
-        f"🔬 {Fore.green}Total Mutations:{Style.reset} {final_totals['total_mutations']}, \n\n"
-        f"✅ {Fore.green}Alive at Conclusion:{Style.reset} {alive}, "
-        f"🌿 {Fore.green}Thriving:{Style.reset} {thriving}, "
-        f"🫤 {Fore.green}Struggling:{Style.reset} {struggling}"
+        _MSG_FINAL_TOTALS,
+        world_name,
+        epochs,
+        final_totals["run_id"],
+        total,
+        max_entities,
+        final_totals["total_deaths"],
+        final_totals["total_births"],
+        final_totals["total_mutations"],
+        alive,
+        thriving,
+        struggling,
     )
 
     append_totals_to_file()
@@ -86,18 +129,63 @@ def append_totals_to_file(filename: Path = TOTALS_FILE):
     Each entry is appended as a new object in a list.
     """
     try:
-        data = []
-        if filename.exists():
-            try:
-                data = json.loads(filename.read_text())
-            except json.JSONDecodeError:
-                data = []
-
-        data.append(final_totals.copy())
-        filename.write_text(json.dumps(data, indent=2))
-        logger.info(f"✅ Final totals appended to {filename}")
+        with _write_lock:
+            data = []
+            if filename.exists():
+                try:
+                    data = json.loads(filename.read_text())
+                except json.JSONDecodeError:
+                    data = []
+
+            data.append(final_totals.copy())
+            filename.write_text(json.dumps(data, indent=2))
+        logger.info("✅ Final totals appended to %s", filename)
     except Exception as e:
-        logger.error(f"❌ Failed to append totals to {filename}: {e}")
+        logger.error("❌ Failed to append totals to %s: %s", filename, e)
+
+
+# Per-birth/per-mutation debug messages, formatted lazily by the logger
+_MSG_BIRTH = (
+    Back.red + "Time %s: Entity %s reproduced! New entity %s - %s born." + Style.reset
+)
+_MSG_MUTATION = (
+    Fore.green
+    + "Mutation Event: %s mutated! Original Value: %s - New Value: %s."
+    + Style.reset
+)
+_MSG_DEATH = Back.yellow + "%s - %s died. (Age:%s) at %s " + Style.reset
+_MSG_DISASTER = (
+    Fore.blue
+    + "Disaster Event: %s occurred during the %s epoch - %s died "
+    + Style.reset
+    + " "
+)
+
+# High-volume events that can be tracked a batch at a time:
+# event type -> (total to bump, log level, message template)
+_BATCHED_EVENTS = {
+    "death": ("total_deaths", logging.INFO, _MSG_DEATH),
+    "birth": ("total_births", logging.DEBUG, _MSG_BIRTH),
+    "mutation": ("total_mutations", logging.DEBUG, _MSG_MUTATION),
+}
+
+
+def track_events(event_type: str, records: list[tuple]):
+    """
+    Batched form of event_tracker for deaths, births and mutations.
+    Bumps the total once for the whole batch and only walks the records
+    when their log level is enabled.
+    Args:
+        event_type (str): Type of the events ('death', 'birth', 'mutation').
+        records (list[tuple]): One tuple of message arguments per event:
+            death (id, name, age, time), birth (time, parent id, child id,
+            child name), mutation (name, original value, new value).
+    """
+    total, level, message = _BATCHED_EVENTS[event_type]
+    final_totals[total] += len(records)
+    if logger.isEnabledFor(level):
+        for record in records:
+            logger.log(level, message, *record)
 
 
 def event_tracker(event_type: str, **kwargs):
@@ -112,9 +200,7 @@ def event_tracker(event_type: str, **kwargs):
         entity = kwargs.get("entity")
         time = kwargs.get("time")
         if entity:
-            logger.info(
-                f"{Back.yellow}{entity.id} - {entity.name} died. (Age:{entity.age}) at {time} {Style.reset}"
-            )
+            logger.info(_MSG_DEATH, entity.id, entity.name, entity.age, time)
         final_totals["total_deaths"] += 1
 
     elif event_type == "birth":
@@ -122,31 +208,25 @@ def event_tracker(event_type: str, **kwargs):
         new_entity = kwargs.get("new_entity")
         time = kwargs.get("time")
         if entity and new_entity and time is not None:
-            logger.debug(
-                f"{Back.red}Time {time}: Entity {entity.id} reproduced! New entity {new_entity.id} - {new_entity.name} born.{Style.reset}"
-            )
+            logger.debug(_MSG_BIRTH, time, entity.id, new_entity.id, new_entity.name)
         final_totals["total_births"] += 1
 
     elif event_type == "disaster":
         event = kwargs.get("event")
         time = kwargs.get("time")
         name = kwargs.get("name")
-        logger.warning(
-            f"{Fore.blue}Disaster Event: {event} occurred during the {time} epoch - {name} died {Style.reset} "
-        )
+        logger.warning(_MSG_DISASTER, event, time, name)
         final_totals["total_disasters"] += 1
 
     elif event_type == "mutation":
         name = kwargs.get("name")
         original_value = kwargs.get("original_value")
         new_value = kwargs.get("new_value")
-        logger.debug(
-            f"{Fore.green}Mutation Event: {name} mutated! Original Value: {original_value} - New Value: {new_value}.{Style.reset}"
-        )
+        logger.debug(_MSG_MUTATION, name, original_value, new_value)
         final_totals["total_mutations"] += 1
 
     else:
-        logger.warning(f"Unknown event type: {event_type}")
+        logger.warning("Unknown event type: %s", event_type)
 
 
 def compare_last_runs(n=5, filename: Path = TOTALS_FILE):
@@ -161,7 +241,7 @@ def compare_last_runs(n=5, filename: Path = TOTALS_FILE):
     if not os.path.exists(filename):
         print("No simulation history found.")
         return []
-    os.system("cls" if os.name == "nt" else "clear")
+    clear_screen()
     with open(filename) as f:
         data = json.load(f)
 
@@ -219,53 +299,10 @@ def compare_last_runs(n=5, filename: Path = TOTALS_FILE):
     return data[-n:]
 
 
-# def record_trait_snapshot(entities, epoch: int):
-#     """
-#     Record average trait values across all living entities for this epoch.
-#     """
-#     alive = [e for e in entities if e.is_alive()]
-#     if not alive:
-#         # No survivors — still log a zeroed-out snapshot
-#         trait_history.append(
-#             {
-#                 "epoch": epoch,
-#                 "population": 0,
-#                 "avg_resilience": 0.0,
-#                 "avg_metabolism_rate": 0.0,
-#                 "avg_reproduction_chance": 0.0,
-#                 "avg_health": 0.0,
-#                 "avg_energy": 0.0,
-#             }
-#         )
-#         return
-
-#     trait_history.append(
-#         {
-#             "epoch": epoch,
-#             "population": len(alive),
-#             "avg_resilience": sum(e.resilience for e in alive) / len(alive),
-#             "avg_metabolism_rate": sum(e.metabolism_rate for e in alive) / len(alive),
-#             "avg_reproduction_chance": sum(e.reproduction_chance for e in alive)
-#             / len(alive),
-#             "avg_health": sum(e.health for e in alive) / len(alive),
-#             "avg_energy": sum(e.energy for e in alive) / len(alive),
-#         }
-#     )
-
-
-# def save_trait_history(filename="logs/trait_evolution.json"):
-#     """
-#     Save all recorded trait history data to a JSON file at the end of the simulation.
-#     """
-
-#     os.makedirs(os.path.dirname(filename), exist_ok=True)
-#     with open(filename, "w") as f:
-#         json.dump(trait_history, f, indent=2)
-
-
-def record_trait_snapshot(entities, epoch: int):
-    alive = [e for e in entities if e.is_alive()]
-    if not alive:
+def record_trait_snapshot(population, epoch: int):
+    """Append the living population's average traits for this epoch."""
+    rows = population.alive_idx
+    if not rows.size:
         trait_history.append(
             {
                 "epoch": epoch,
@@ -279,23 +316,27 @@ def record_trait_snapshot(entities, epoch: int):
         )
         return
 
+    # Column means over the living rows, accumulated in float64
     trait_history.append(
         {
             "epoch": epoch,
-            "population": len(alive),
-            "avg_resilience": sum(e.resilience for e in alive) / len(alive),
-            "avg_metabolism_rate": sum(e.metabolism_rate for e in alive) / len(alive),
-            "avg_reproduction_chance": sum(e.reproduction_chance for e in alive)
-            / len(alive),
-            "avg_health": sum(e.health for e in alive) / len(alive),
-            "avg_energy": sum(e.energy for e in alive) / len(alive),
+            "population": int(rows.size),
+            "avg_resilience": float(population.resilience[rows].mean(dtype=np.float64)),
+            "avg_metabolism_rate": float(
+                population.metabolism_rate[rows].mean(dtype=np.float64)
+            ),
+            "avg_reproduction_chance": float(
+                population.reproduction_chance[rows].mean(dtype=np.float64)
+            ),
+            "avg_health": float(population.health[rows].mean(dtype=np.float64)),
+            "avg_energy": float(population.energy[rows].mean(dtype=np.float64)),
         }
     )
 
 
 def save_trait_history(filename="logs/trait_evolution.json"):
     os.makedirs(os.path.dirname(filename), exist_ok=True)
-    with open(filename, "w") as f:
+    with _write_lock, open(filename, "w") as f:
         json.dump(trait_history, f, indent=2)
 
 
@@ -310,46 +351,49 @@ def update_global_trait_tracker(filename="logs/trait_tracker.json"):
         -1
     ]  # could average all epochs, but last epoch is often most interesting
 
-    # Load existing tracker
-    if os.path.exists(filename):
-        with open(filename, "r") as f:
-            tracker = json.load(f)
-    else:
-        tracker = {
-            "total_runs": 0,
-            "avg_resilience": 0.0,
-            "avg_metabolism_rate": 0.0,
-            "avg_reproduction_chance": 0.0,
-            "avg_health": 0.0,
-            "avg_energy": 0.0,
-            "avg_population": 0.0,
-        }
-
-    n = tracker["total_runs"]
-    tracker["total_runs"] += 1
-
-    # Running average update (classic incremental mean)
-    tracker["avg_resilience"] = (
-        tracker["avg_resilience"] * n + final_epoch["avg_resilience"]
-    ) / (n + 1)
-    tracker["avg_metabolism_rate"] = (
-        tracker["avg_metabolism_rate"] * n + final_epoch["avg_metabolism_rate"]
-    ) / (n + 1)
-    tracker["avg_reproduction_chance"] = (
-        tracker["avg_reproduction_chance"] * n + final_epoch["avg_reproduction_chance"]
-    ) / (n + 1)
-    tracker["avg_health"] = (tracker["avg_health"] * n + final_epoch["avg_health"]) / (
-        n + 1
-    )
-    tracker["avg_energy"] = (tracker["avg_energy"] * n + final_epoch["avg_energy"]) / (
-        n + 1
-    )
-    tracker["avg_population"] = (
-        tracker["avg_population"] * n + final_epoch["population"]
-    ) / (n + 1)
+    # Read-modify-write of a file shared by every run
+    with _write_lock:
+        # Load existing tracker
+        if os.path.exists(filename):
+            with open(filename, "r") as f:
+                tracker = json.load(f)
+        else:
+            tracker = {
+                "total_runs": 0,
+                "avg_resilience": 0.0,
+                "avg_metabolism_rate": 0.0,
+                "avg_reproduction_chance": 0.0,
+                "avg_health": 0.0,
+                "avg_energy": 0.0,
+                "avg_population": 0.0,
+            }
 
-    with open(filename, "w") as f:
-        json.dump(tracker, f, indent=2)
+        n = tracker["total_runs"]
+        tracker["total_runs"] += 1
+
+        # Running average update (classic incremental mean)
+        tracker["avg_resilience"] = (
+            tracker["avg_resilience"] * n + final_epoch["avg_resilience"]
+        ) / (n + 1)
+        tracker["avg_metabolism_rate"] = (
+            tracker["avg_metabolism_rate"] * n + final_epoch["avg_metabolism_rate"]
+        ) / (n + 1)
+        tracker["avg_reproduction_chance"] = (
+            tracker["avg_reproduction_chance"] * n
+            + final_epoch["avg_reproduction_chance"]
+        ) / (n + 1)
+        tracker["avg_health"] = (
+            tracker["avg_health"] * n + final_epoch["avg_health"]
+        ) / (n + 1)
+        tracker["avg_energy"] = (
+            tracker["avg_energy"] * n + final_epoch["avg_energy"]
+        ) / (n + 1)
+        tracker["avg_population"] = (
+            tracker["avg_population"] * n + final_epoch["population"]
+        ) / (n + 1)
+
+        with open(filename, "w") as f:
+            json.dump(tracker, f, indent=2)
 
 
 # filepath: /home/jtk/Dev/TerminalLifeform/src/stats.py
@@ -0,0 +1,30 @@
+"""
+File: test_parallel_runs.py
+Author: Jtk III
+Date: 2026-10-15
+Description: Test script for running simulations across worker processes.
+"""
+
+from parallel_runs import run_many
+
+if __name__ == "__main__":
+    try:
+        results = run_many(
+            ["default"], n_runs=2, n_workers=2, entities=10, epochs=5, seed=7
+        )
+        assert len(results) == 2, "Expected one result per run"
+        assert [r["seed"] for r in results] == [7, 8], "Runs came back out of order"
+        assert all(r["world_name"] == "Default World" for r in results)
+
+        # A seeded run is reproducible, even in a different process
+        again = run_many(
+            ["default"], n_runs=1, n_workers=1, entities=10, epochs=5, seed=7
+        )
+        keys = ("total_births", "total_deaths", "max_entities")
+        assert all(again[0][k] == results[0][k] for k in keys), "Seeded run differed"
+        print("✅ Tests completed successfully.")
+    except Exception as e:
+        print(f"❌ Test failed: {e}")
+        raise e
+
+# Filepath: /home/jtk/Dev/TerminalLifeform/src/tests/test_parallel_runs.py
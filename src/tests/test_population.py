@@ -0,0 +1,83 @@
+"""
+File: test_population.py
+Author: Jtk III
+Date: 2026-10-15
+Description: Test script for the structure-of-arrays Population store.
+"""
+
+from entity import Entity
+from population import MEMORY_SPAN, Population
+
+try:
+    pop = Population(capacity=2)
+    entities = [Entity(pop) for _ in range(5)]
+    assert pop.size == 5 and pop.capacity >= 5, "Population did not grow"
+    pop.reserve(20)
+    assert pop.capacity >= 25, "reserve() did not make room for the batch"
+    assert pop.alive_count() == 5, "New entities should be alive"
+
+    entities[0].health = 0
+    entities[1].age = entities[1].parameters["max_age"]
+    entities[2].health, entities[2].energy = 90.0, 90.0
+    pop.update_status()
+
+    assert entities[0].status == "dead" and not entities[0].is_alive()
+    assert entities[1].status == "dead" and entities[1].energy == 0.0
+    assert entities[2].status == "thriving"
+    assert pop.alive_count() == 3, "Dead entities still counted as alive"
+    thriving = sum(e.status == "thriving" for e in entities)
+    assert pop.count_status(entities[2].status_code) == thriving
+    counts = pop.status_counts()
+    assert counts.sum() == 3 and counts[entities[2].status_code] == thriving
+
+    rows, partners = pop.pick_partners(3)
+    assert rows.size == 6, "Three living rows should each get two partners"
+    assert not (rows == partners).any(), "A row was paired with itself"
+
+    # Neighbour picks stay inside the radius and never pair a row with itself
+    for entity, (x, y) in zip(
+        entities, ((0, 0), (3, 4), (40, 40), (5, 0), (0, 0)), strict=True
+    ):
+        entity.x, entity.y = x, y
+    found = 0
+    for _ in range(20):
+        rows, partners = pop.pick_neighbours(3, 6.0)
+        found += rows.size
+        assert not (rows == partners).any(), "A row was its own neighbour"
+        dist2 = (pop.x[rows] - pop.x[partners]) ** 2 + (
+            pop.y[rows] - pop.y[partners]
+        ) ** 2
+        assert (dist2 <= 36).all(), "Picked a partner outside the radius"
+        assert entities[2].index not in rows, "Isolated entity found a neighbour"
+    assert found, "Close neighbours never met"
+
+    sample = pop.sample_alive(10)
+    assert len(sample) == 3 and all(pop.alive[sample])
+
+    # Batched kills mark rows dead and refresh the cached indices
+    pop.kill(sample[:1])
+    assert pop.alive_count() == 2 and pop.entities[sample[0]].status == "dead"
+    entities[3].mark_dead()
+    assert not entities[3].is_alive() and entities[3].health == 0.0
+
+    # Environment memory is a fixed-size ring buffer per row
+    for step in range(MEMORY_SPAN + 3):
+        pop.remember(entities[2].index, float(step))
+    recent = entities[2].environment_memory
+    assert recent == [float(s) for s in range(3, MEMORY_SPAN + 3)], "Ring order wrong"
+    assert pop.memory_average([entities[2].index])[0] == sum(recent) / MEMORY_SPAN
+
+    # Dead rows are recycled instead of growing the population
+    dead = entities[0]
+    pop.release(dead)
+    size = pop.size
+    reborn = pop.acquire({"initial_health": 88.0})
+    assert reborn is dead and pop.size == size, "Released row was not reused"
+    assert reborn.is_alive() and reborn.health == 88.0 and reborn.age == 0
+    assert reborn.environment_memory == [], "Recycled row kept its memory"
+    print("✅ Tests completed successfully.")
+except Exception as e:
+    print(f"❌ Test failed: {e}")
+    raise e
+
+# Filepath: /home/jtk/Dev/TerminalLifeform/src/tests/test_population.py
@@ -0,0 +1,36 @@
+"""
+File: ansi.py
+Author: Jtk III
+Date: 2026-10-15
+Description: Plain ANSI escape constants used for colored terminal output.
+"""
+
+
+class Fore:
+    """Foreground colors (256-color palette)."""
+
+    red = "\x1b[38;5;1m"
+    green = "\x1b[38;5;2m"
+    yellow = "\x1b[38;5;3m"
+    blue = "\x1b[38;5;4m"
+    magenta = "\x1b[38;5;5m"
+    cyan = "\x1b[38;5;6m"
+
+
+class Back:
+    """Background colors (256-color palette)."""
+
+    red = "\x1b[48;5;1m"
+    green = "\x1b[48;5;2m"
+    yellow = "\x1b[48;5;3m"
+    blue = "\x1b[48;5;4m"
+    magenta = "\x1b[48;5;5m"
+    cyan = "\x1b[48;5;6m"
+
+
+class Style:
+    BOLD = "\x1b[1m"
+    reset = "\x1b[0m"
+
+
+# filepath: /home/jtk/Dev/TerminalLifeform/src/utils/ansi.py
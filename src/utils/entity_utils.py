@@ -5,85 +5,24 @@ Date: 2024-06-10
 Description: Utility functions for entity state calculations.
 """
 
-import random
+import logging
 
-from entity import Entity, Status
+import numpy as np
+
+from entity import Entity
+from kernels import DORMANT, adapt_kernel, process_kernel
 from utils.logging_config import setup_logger
-from utils.utils import passive_aggressive_threshold, pause_simulation
+from utils.utils import pause_simulation
 
 # from utils.utils import pause_simulation, time_passes
 WORLD_WIDTH = 1920
 WORLD_HEIGHT = 1080
 logger = setup_logger(__name__)
 
-
-def calc_energy_change(entity: Entity, environment_factors: dict) -> float:
-    """
-    Calculates net energy change from consumption and gain from environment.
-    """
-
-    # Metabolism cost (base + health penalty)
-    energy_consumed = entity.parameters["metabolism_rate"]
-
-    if entity.health < 50.0:
-        energy_consumed += (50.0 - entity.health) * 0.1
-
-    # Energy gain from environment (e.g., food intake)
-    resource_availability = environment_factors.get("resource_availability", 1.0)
-    foraging_efficiency = entity.parameters.get("foraging_efficiency", 1.0)
-
-    energy_gained = resource_availability * foraging_efficiency * 1.8  # scale as needed
-
-    # Starvation penalty (inefficiency when resources are low)
-    if resource_availability < 1.0:
-        energy_consumed += (1.0 - resource_availability) * 5.0
-
-    return energy_gained - energy_consumed
-
-
-def calc_health_change(entity: Entity, environment_factors: dict) -> float:
-    energy = entity.energy
-    temperature = environment_factors.get("temperature", 25.0)
-    pollution = environment_factors.get("pollution", 0.0)
-    radiation = environment_factors.get("radiation_background", 0.0)
-    recovery = entity.health_recovery_rate
-    decay = entity.health_decay_rate
-    resilience = entity.parameters["resilience"]
-    death_rate = environment_factors.get("death_rate", 1.33)
-
-    health_change = -0.005  # Base decay
-
-    if entity.health >= 95.0:
-        return health_change  # No more gain; just base decay
-
-    if radiation > 0.2:
-        decay += (
-            (radiation - 0.2) * (1.5 - resilience) * 0.5
-        )  # Radiation increases decay
-
-    # Energy effect
-    if energy > 50.0:
-        health_change += (energy - 50.0) * recovery * 0.1
-    else:
-        health_change -= (50.0 - energy) * decay * 0.1
-
-    # Temperature penalty
-    if temperature < 10.0 or temperature > 35.0:
-        temp_penalty = abs(temperature - 22.5) * (1.0 - resilience) * 0.1
-        health_change -= temp_penalty
-
-    # Pollution penalty
-    if pollution > 0.1:
-        pollution_penalty = pollution * (1.3 - resilience) * 3.0
-        health_change -= pollution_penalty
-
-    # Finally just age-related decay
-    health_change -= 0.5 * (entity.age**death_rate)  # Exponential decay with age
-
-    # Uncomment the line below for a linear decay with age
-    # health_change -= entity.age * 0.01  # Linear decay with age stable
-
-    return health_change
+# Per-entity log templates, %-formatted only if the record is emitted
+_MSG_ATTACK = "%s (ID:%s) attacked! %s (ID:%s) for %.1f damage."
+_MSG_KILLED = "%s (ID:%s) has died from the attack!"
+_MSG_MOVED = "👉 %s (ID:%s) moved (%d, %d)"
 
 
 def validate_entity_params(params: dict):
@@ -106,51 +45,97 @@ def add_entity(sim, entity: Entity):
     validate_entity_params(entity.parameters)
     sim.entities.append(entity)
     sim.total_entities += 1
-    logger.info(f"Added new entity: {entity.id}: {entity.name}")
+    logger.info("Added new entity: %s: %s", entity.id, entity.name)
 
 
-def process_entity(sim, entity: Entity):
+def process_entities(sim):
     """
-    Applies all updates to a single entity for the current Epoch.
+    Applies all updates to every living entity for the current Epoch.
     """
-
-    if not entity.is_alive() or entity.status == "dead":
-        return  # Skip dead entities
-
-    for entity in sim.entities:
-        condition = sim.environment_factors["resource_availability"] - 0.5
-        entity.environment_memory.append(condition)
-        if len(entity.environment_memory) > entity.memory_span:
-            entity.environment_memory.pop(0)
-
-    if passive_aggressive_threshold(entity.aggression) > random.random():
-        if sim.environment_factors["resource_availability"] < 0.6:
-            if random.random() < 0.2:  # don't log every time
-                logger.info("\n😈 Ent on Ent Violence!")
-                pause_simulation(10, desc="agressive beahiour?", delay=0.01)
-            # ents attacking each other?
-            if len(sim.entities) > 1:
-                target = random.choice(
-                    [e for e in sim.entities if e.id != entity.id and e.is_alive()]
-                )
-                if target:
-                    damage = random.uniform(5.0, 15.0) * (1.0 - target.resilience)
-                    target.health -= damage
-                    logger.info(
-                        f"{entity.name} (ID:{entity.id}) attacked! {target.name} (ID:{target.id}) for {damage:.1f} damage."
-                    )
-                    if target.health <= 0:
-                        target.update_status()
-                        logger.info(
-                            f"{target.name} (ID:{target.id}) has died from the attack!"
-                        )
-
-    entity.age += 1
-    energy_change = calc_energy_change(entity, sim.environment_factors)
-    entity.energy = max(0.0, min(100.0, entity.energy + energy_change))
-    health_change = calc_health_change(entity, sim.environment_factors)
-    entity.health = max(0.0, min(100.0, entity.health + health_change))
-    entity.update_status()
+    pop = sim.population
+    rows = pop.alive_idx  # Skip dead entities
+    if rows.size == 0:
+        return
+
+    # Record current environment condition relative to baseline, once per
+    # epoch; handle_enviroment_memory and adapt_entities both read it
+    condition = sim.env.resource_availability - 0.5
+    pop.remember(rows, condition)
+
+    if sim.env.resource_availability < 0.6:
+        handle_attacks(sim, rows)
+        rows = pop.alive_idx  # the attacks may have killed some
+
+    # Age, energy, health and status in one compiled pass over the rows
+    env = sim.env
+    process_kernel(
+        pop.health,
+        pop.energy,
+        pop.age,
+        pop.max_age,
+        pop.status,
+        pop.alive,
+        pop.base_metabolism_rate,
+        pop.base_foraging_efficiency,
+        pop.health_recovery_rate,
+        pop.health_decay_rate,
+        pop.base_resilience,
+        rows,
+        env.resource_availability,
+        env.temperature,
+        env.pollution,
+        env.radiation_background,
+        env.death_rate,
+        pop.thriving_health,
+        pop.thriving_energy,
+        pop.struggling_health,
+        pop.struggling_energy,
+    )
+    pop.invalidate()
+
+
+def handle_attacks(sim, rows: np.ndarray):
+    """
+    Ents attacking each other: every row whose aggression roll succeeds
+    hits one other random living row, all at once.
+    """
+    pop = sim.population
+    if rows.size < 2:
+        return
+
+    # passive_aggressive_threshold, over the whole column
+    threshold = np.clip(0.5 + (pop.aggression[rows] - 0.5) * 2, 0.0, 1.0)
+    rolls = pop.rng.random((2, rows.size))
+    attacking = threshold > rolls[0]
+    attackers = rows[attacking]
+    if attackers.size == 0:
+        return
+
+    if (rolls[1][attacking] < 0.2).any():  # don't log every time
+        logger.info("\n😈 Ent on Ent Violence!")
+        pause_simulation(10, desc="agressive beahiour?", delay=0.01)
+
+    # A random other living row per attacker: offset 1..n-1 from its own
+    # position, so nobody attacks itself
+    positions = np.flatnonzero(attacking)
+    offsets = pop.rng.integers(1, rows.size, attackers.size)
+    targets = rows[(positions + offsets) % rows.size]
+    damage = pop.rng.uniform(5.0, 15.0, attackers.size) * (
+        1.0 - pop.resilience[targets]
+    )
+    np.subtract.at(pop.health, targets, damage)
+
+    if logger.isEnabledFor(logging.INFO):
+        for attacker, target, hit in zip(attackers, targets, damage, strict=True):
+            a, t = pop.entities[attacker], pop.entities[target]
+            logger.info(_MSG_ATTACK, a.name, a.id, t.name, t.id, hit)
+
+    killed = np.unique(targets[pop.health[targets] <= 0])
+    if killed.size:
+        pop.kill(killed)
+        for target in killed:
+            t = pop.entities[target]
+            logger.info(_MSG_KILLED, t.name, t.id)
 
 
 def adapt_entities(sim):
@@ -158,84 +143,53 @@ def adapt_entities(sim):
     Adjust entity traits based on environmental history.
     Resets memory on significant mutation to simulate evolutionary leaps.
     """
-    for entity in sim.entities:
-        if not entity.is_alive():
-            continue
-
-        # Initialize memory-related attributes if missing
-        if not hasattr(entity, "environment_memory"):
-            entity.environment_memory = []
-        if not hasattr(entity, "memory_span"):
-            entity.memory_span = 20
-
-        # Record current environment condition relative to baseline
-        condition = sim.environment_factors["resource_availability"] - 0.5
-        entity.environment_memory.append(condition)
-        if len(entity.environment_memory) > entity.memory_span:
-            entity.environment_memory.pop(0)
-
-        avg_condition = sum(entity.environment_memory) / len(entity.environment_memory)
-
-        # --- 1. Phenotypic adaptation (within lifetime) ---
-        if avg_condition < -0.1:
-            # Scarcity = survival traits
-            entity.resilience *= 1.02
-            entity.metabolism_rate *= 0.97
-            entity.reproduction_chance *= 0.93
-            entity.aggression *= 1.01
-            entity.foraging_efficiency *= 1.03
-        elif avg_condition > 0.1:
-            # Abundance = growth traits
-            entity.resilience *= 0.97
-            entity.metabolism_rate *= 1.03
-            entity.reproduction_chance *= 1.07
-            entity.aggression *= 0.99
-            entity.foraging_efficiency *= 0.97
-
-        # --- 2. Small random drift ---
-        drift = random.uniform(0.98, 1.02)
-        entity.resilience *= drift
-        entity.metabolism_rate *= drift
-        entity.reproduction_chance *= drift
-        entity.aggression *= drift
-        entity.foraging_efficiency *= drift
-
-        # --- 3. Mutation events (evolutionary leaps) ---
-        if random.random() < sim.environment_factors.get("mutation_rate", 0.05) * 0.1:
-            # Reset memory on big mutation — the entity 'forgets' old pressures
-            entity.environment_memory.clear()
-
-            # Big changes (±20%) — this simulates evolution, not just plasticity
-            mutation_factor = random.uniform(0.8, 1.2)
-            entity.resilience *= mutation_factor
-            entity.metabolism_rate *= mutation_factor
-            entity.reproduction_chance *= mutation_factor
-            entity.aggression *= mutation_factor
-            entity.foraging_efficiency *= mutation_factor
-
-        # --- 4. Clamp to avoid runaway traits ---
-        entity.resilience = max(0.1, min(entity.resilience, 5.0))
-        entity.metabolism_rate = max(0.1, min(entity.metabolism_rate, 5.0))
-        entity.reproduction_chance = max(0.001, min(entity.reproduction_chance, 2.0))
-        entity.aggression = max(0.0, min(entity.aggression, 1.0))
-        entity.foraging_efficiency = max(0.1, min(entity.foraging_efficiency, 5.0))
-
-
-def move_entity(entity):
-    """Simple random movement — can evolve later."""
-    if not entity.is_alive() or entity.status == Status.DORMANT:
-        return  # don't move if dead or dormant
-
-    dx = random.choice([-1, 0, 1])
-    dy = random.choice([-1, 0, 1])
+    # This epoch's condition was already remembered by process_entities
+    leap_chance = sim.env.mutation_rate * 0.1
+
+    pop = sim.population
+    rows = pop.alive_idx
+    averages = pop.memory_average(rows)
+
+    # Every random draw for the pass, made up front in batches
+    drifts = pop.rng.uniform(0.98, 1.02, rows.size)
+    leaps = pop.rng.random(rows.size) < leap_chance
+    mutation_factors = pop.rng.uniform(0.8, 1.2, rows.size)
+
+    # 1. phenotypic adaptation, 2. small random drift, 3. evolutionary leaps
+    # (big ±20% changes) and 4. clamping, compiled over the trait columns
+    adapt_kernel(
+        pop.resilience,
+        pop.metabolism_rate,
+        pop.reproduction_chance,
+        pop.aggression,
+        pop.foraging_efficiency,
+        rows,
+        averages,
+        drifts,
+        leaps,
+        mutation_factors,
+    )
+
+    # Reset memory on big mutation — the entity 'forgets' old pressures
+    pop.forget(rows[leaps])
+
+
+def move_entities(sim):
+    """Simple random movement for every entity at once — can evolve later."""
+    pop = sim.population
+    rows = pop.alive_idx
+    rows = rows[pop.status[rows] != DORMANT]  # don't move if dead or dormant
+
+    dx, dy = pop.rng.integers(-1, 2, (2, rows.size))
 
     # Future: bias dx/dy by traits or environment
 
-    entity.x = max(0, min(WORLD_WIDTH, entity.x + dx))
-    entity.y = max(0, min(WORLD_HEIGHT, entity.y + dy))
+    pop.x[rows] = np.clip(pop.x[rows] + dx, 0, WORLD_WIDTH)
+    pop.y[rows] = np.clip(pop.y[rows] + dy, 0, WORLD_HEIGHT)
 
-    if random.random() < 0.033:  # log occasionally
-        logger.info(f"👉 {entity.name} (ID:{entity.id}) moved ({entity.x}, {entity.y})")
+    for row in rows[pop.rng.random(rows.size) < 0.033]:  # log occasionally
+        entity = pop.entities[row]
+        logger.info(_MSG_MOVED, entity.name, entity.id, entity.x, entity.y)
         pause_simulation(5, desc="entity moving...", delay=0.01)
 
 
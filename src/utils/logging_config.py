@@ -6,6 +6,7 @@ Description: Logging configuration for the simulation.
 """
 
 import logging
+import os
 from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]  # goes up from src/ to project root
@@ -14,29 +15,58 @@ LOGS_DIR.mkdir(exist_ok=True)  # ensure logs/ exists
 LOG_FILE = LOGS_DIR / "simulation.log"
 
 
-def setup_logger(name=__name__):
-    logger = logging.getLogger(name)
-    logger.setLevel(
-        logging.INFO
-    )  # Set to logging.DEBUG to see detailed interaction logs
+_HANDLERS = []  # file + console handlers shared by every module's logger
+_LOGGERS = []  # every logger set up here, so their level can change together
+_level = logging.INFO  # Set to logging.DEBUG to see detailed interaction logs
+
 
-    # Use mode="w" to overwrite the log file each run
-    file_handler = logging.FileHandler(LOG_FILE, mode="w")
-    console_handler = logging.StreamHandler()
-    formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+def _shared_handlers():
+    """Create the file and console handlers once per process."""
+    if not _HANDLERS:
+        formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
 
-    file_handler.setLevel(logging.INFO)
-    file_handler.setFormatter(formatter)
+        # Use mode="w" to overwrite the log file each run. The file is only
+        # opened on the first record, so worker processes can redirect it
+        # before importing this module truncates anything
+        file_handler = logging.FileHandler(LOG_FILE, mode="w", delay=True)
+        console_handler = logging.StreamHandler()
 
-    console_handler.setLevel(logging.INFO)
-    console_handler.setFormatter(formatter)
+        for handler in (file_handler, console_handler):
+            handler.setLevel(logging.INFO)
+            handler.setFormatter(formatter)
+            _HANDLERS.append(handler)
+    return _HANDLERS
+
+
+def setup_logger(name=__name__):
+    logger = logging.getLogger(name)
+    logger.setLevel(_level)
 
     # Prevent adding handlers multiple times
     if not logger.handlers:
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
+        for handler in _shared_handlers():
+            logger.addHandler(handler)
+        _LOGGERS.append(logger)
 
     return logger
 
 
+def setup_worker_logging(level=logging.WARNING) -> None:
+    """
+    Log a worker process to its own file, simulation-<pid>.log, in append
+    mode, and only at `level` and above, so parallel runs neither truncate
+    each other's log nor flood the shared console.
+    """
+    global _level
+    _level = level
+    file_handler, console_handler = _shared_handlers()
+    file_handler.close()
+    file_handler.baseFilename = str(LOGS_DIR / f"simulation-{os.getpid()}.log")
+    file_handler.mode = "a"
+    for handler in (file_handler, console_handler):
+        handler.setLevel(level)
+    for logger in _LOGGERS:
+        logger.setLevel(level)
+
+
 # filepath: /home/jtk/Dev/TerminalLifeform/src/utils/logging_config.py
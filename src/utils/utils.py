@@ -6,12 +6,33 @@ Description: General utility functions for the simulation.
 """
 
 import random
+import sys
 import time
 
 from tqdm import tqdm
 
+# Set by Simulation for headless runs; skips every cosmetic pause
+_headless = False
+# Pacing rolls get their own generator, so skipping them (headless) never
+# shifts the seeded draws the simulation itself makes
+_pacing_rng = random.Random()
+
+
+def set_headless(flag: bool) -> None:
+    """Turn the cosmetic pauses below off (True) or back on (False)."""
+    global _headless
+    _headless = flag
+
+
+def clear_screen():
+    """Clear the terminal with an ANSI escape instead of spawning cls/clear."""
+    sys.stdout.write("\x1b[2J\x1b[H")
+    sys.stdout.flush()
+
 
 def pause_simulation(r: int, desc: str = "Pausing Simulation", delay: float = 0.01):
+    if _headless:
+        return
     for _ in tqdm(range(r), desc=desc):
         time.sleep(delay)  # simulate time passing
 
@@ -28,7 +49,9 @@ def passive_aggressive_threshold(aggressiveness: float) -> float:
 
 def time_passes(delay: float = 0.01):
     """Simulate time passing with a short delay."""
-    if random.random() < 0.1:  # 10% chance to pause
+    if _headless:
+        return
+    if _pacing_rng.random() < 0.1:  # 10% chance to pause
         time.sleep(delay)  # simulate time passing
 
 